@@ -47,6 +47,17 @@ class BaseModelAdmin(ModelAdmin):
         )
 
 
+class JobsCountAdminMixin:
+    """
+    Show count of related jobs, read from the denormalized `jobs_count`
+    counter instead of counted per row, and sortable
+    """
+
+    @admin.display(description=_("jobs count"), ordering="jobs_count")
+    def jobs_count(self, obj):
+        return obj.jobs_count
+
+
 class SortableAdmin(ModelAdmin):
     def get_ordering(self, request):
         ordering = list(super().get_ordering(request))
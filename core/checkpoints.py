@@ -0,0 +1,33 @@
+import json
+from hashlib import md5
+from typing import Any
+
+from django.core.cache import cache
+
+
+class Checkpoint:
+    """
+    Progress of a long-running task, kept in cache. A retried task reads it to
+    resume from where the previous run stopped, instead of starting over.
+    """
+
+    timeout = 24 * 60 * 60
+
+    def __init__(self, name: str, *args):
+        """
+        Args:
+            name: task name
+            *args: task arguments identifying the work, JSON serializable
+        """
+
+        digest = md5(json.dumps(args, sort_keys=True).encode()).hexdigest()
+        self.key = f"checkpoint:{name}:{digest}"
+
+    def get(self, default: Any = None) -> Any:
+        return cache.get(self.key, default)
+
+    def save(self, value: Any):
+        cache.set(self.key, value, timeout=self.timeout)
+
+    def clear(self):
+        cache.delete(self.key)
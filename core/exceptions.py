@@ -4,3 +4,7 @@ class NoLinkedinAccountError(Exception):
 
 class NotValidCompanyError(Exception):
     """No valid company error"""
+
+
+class TimeLimitError(Exception):
+    """Time limit exceeded error"""
@@ -0,0 +1,45 @@
+import re
+
+from django.db import NotSupportedError, models
+from django.db.models import Lookup
+
+# characters with a meaning in MySQL boolean mode full-text queries
+BOOLEAN_MODE_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+
+def to_boolean_mode_terms(search_term: str) -> list[str]:
+    """
+    Turn the words of a search term into required prefix terms of MySQL
+    boolean mode. like: `python dev` -> `["+python*", "+dev*"]`
+
+    Args:
+        search_term: search term entered by a user
+
+    Returns:
+        list[str]: boolean mode terms, empty if the term has no words
+    """
+
+    words = BOOLEAN_MODE_OPERATORS.sub(" ", search_term).split()
+    return [f"+{word}*" for word in words]
+
+
+@models.CharField.register_lookup
+@models.TextField.register_lookup
+class FullTextSearch(Lookup):
+    """
+    `field__search="query"`: MySQL full-text search in boolean mode, the field
+    needs a FULLTEXT index of its own
+    """
+
+    lookup_name = "search"
+
+    def as_mysql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return (
+            f"MATCH ({lhs}) AGAINST ({rhs} IN BOOLEAN MODE)",
+            (*lhs_params, *rhs_params),
+        )
+
+    def as_sql(self, compiler, connection):
+        raise NotSupportedError("Full-text search is only supported on MySQL.")
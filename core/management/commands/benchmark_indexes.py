@@ -0,0 +1,184 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, no_translations
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from job import JobStatus
+from job.models import Job, JobLocation
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare query plans of the job pipeline's hot queries with and without "
+        "the Job indexes, on a seeded table. Only runs on a scratch database, "
+        "with DEBUG on: it drops the Job indexes while it runs."
+    )
+
+    location_geo_id = "benchmark"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            required=True,
+            help='Scratch database to seed and benchmark, with "SCRATCH": True '
+            "in its settings",
+        )
+        parser.add_argument(
+            "--yes",
+            action="store_true",
+            help="Confirm the Job indexes of the database can be dropped",
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=1_000_000,
+            help="Number of jobs in the seeded table",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Number of jobs inserted at once",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the seeded jobs, to run the benchmark again faster",
+        )
+
+    def get_queries(self, location: JobLocation) -> dict:
+        jobs = Job.objects.using(location._state.db)
+        return {
+            "run_process_jobs": jobs.filter(
+                is_active=True,
+                status=JobStatus.PARTIALLY_PROCEEDED,
+                created_at__lt=timezone.now() - timedelta(hours=1),
+            )
+            .order_by("created_at")
+            .values_list("pk", flat=True),
+            "list_approved_jobs": jobs.filter(is_active=True, status=JobStatus.APPROVED)
+            .order_by("pk")
+            .values_list("pk", flat=True),
+            "admin changelist": jobs.filter(
+                status=JobStatus.WAITING_FOR_REVIEW, location=location
+            ).order_by("-pk")[:100],
+        }
+
+    def seed(self, location: JobLocation, rows: int, batch_size: int):
+        jobs = Job.objects.using(location._state.db)
+        seeded = jobs.filter(location=location).count()
+        statuses = [
+            # most jobs are done with, few are waiting in the pipeline
+            *[JobStatus.REJECTED] * 6,
+            *[JobStatus.EXPIRED] * 2,
+            JobStatus.LISTED,
+            JobStatus.WAITING_FOR_REVIEW,
+            JobStatus.APPROVED,
+            JobStatus.PARTIALLY_PROCEEDED,
+        ]
+
+        for offset in range(seeded, rows, batch_size):
+            created = jobs.bulk_create(
+                [
+                    Job(
+                        linkedin_id=f"{self.location_geo_id}-{i}",
+                        title="Benchmark",
+                        status=random.choice(statuses),
+                        is_active=random.random() < 0.9,
+                        location=location,
+                    )
+                    for i in range(offset, min(offset + batch_size, rows))
+                ]
+            )
+            # created_at is set on insert, spread it over the last year, row by row
+            now = timezone.now()
+            created = list(
+                jobs.filter(
+                    location=location,
+                    linkedin_id__in=[job.linkedin_id for job in created],
+                ).only("pk")
+            )
+            for job in created:
+                job.created_at = now - timedelta(days=365) * random.random()
+            jobs.bulk_update(created, ["created_at"], batch_size=1000)
+
+            self.stdout.write(f"Seeded {offset + len(created)} of {rows} jobs")
+
+    def clean_up(self, location: JobLocation, batch_size: int):
+        """
+        Delete the seeded jobs by ranges of primary-keys, without collecting
+        them in memory. Seeded jobs have no relations to cascade to.
+        """
+
+        jobs = Job.objects.using(location._state.db).filter(location=location)
+        bounds = jobs.aggregate(first=Min("pk"), last=Max("pk"))
+        if bounds["first"] is not None:
+            for start in range(bounds["first"], bounds["last"] + 1, batch_size):
+                jobs.filter(pk__gte=start, pk__lt=start + batch_size)._raw_delete(
+                    location._state.db
+                )
+
+        location.delete()
+
+    def explain(self, queries: dict):
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_LABEL(f"  {name}"))
+            self.stdout.write(queryset.explain())
+
+    @no_translations
+    def handle(self, *args, **options):
+        database = options["database"]
+        if database not in connections:
+            raise CommandError(f"Unknown database {database}.")
+        if database == DEFAULT_DB_ALIAS or not connections.settings[database].get(
+            "SCRATCH"
+        ):
+            raise CommandError(
+                f"The {database} database isn't marked as a scratch database, "
+                f'with "SCRATCH": True in its settings.'
+            )
+        if not settings.DEBUG:
+            raise CommandError("Refusing to run with DEBUG off.")
+        if not options["yes"]:
+            raise CommandError(
+                f"This drops the Job indexes of the {database} database while it "
+                f"runs, confirm with --yes."
+            )
+
+        connection = connections[database]
+
+        location, _ = JobLocation.objects.using(database).get_or_create(
+            linkedin_geo_id=self.location_geo_id,
+            defaults={"title": "Benchmark", "iso_code": "BM", "flag_emoji": ""},
+        )
+        self.seed(location, options["rows"], options["batch_size"])
+
+        # refresh table statistics, so the planner knows about the seeded rows
+        analyze = "ANALYZE TABLE" if connection.vendor == "mysql" else "ANALYZE"
+        with connection.cursor() as cursor:
+            cursor.execute(f"{analyze} {Job._meta.db_table}")
+
+        queries = self.get_queries(location)
+        indexes = Job._meta.indexes
+
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(Job, index)
+
+        try:
+            self.stdout.write(self.style.MIGRATE_HEADING("Without indexes:"))
+            self.explain(queries)
+        finally:
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.add_index(Job, index)
+
+        self.stdout.write(self.style.MIGRATE_HEADING("With indexes:"))
+        self.explain(queries)
+
+        if not options["keep"]:
+            self.clean_up(location, options["batch_size"])
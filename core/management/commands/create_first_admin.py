@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand, no_translations
 
+from core.middlewares.force_change_password import DEFAULT_PASSWORD
 from user.models import User
 
 
@@ -8,7 +9,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         if not User.objects.filter(username="admin"):
             self.stdout.write("Creating superuser...")
-            User.objects.create_superuser(username="admin", password="(#ChangeMe!)")
+            User.objects.create_superuser(username="admin", password=DEFAULT_PASSWORD)
             self.stdout.write("Superuser created")
             return
 
@@ -0,0 +1,139 @@
+from typing import Optional
+
+from django.core.management.base import BaseCommand, no_translations
+from django.utils import timezone
+
+from job import JobStatus
+from job.counters import JobCounters
+from job.dedup import DuplicateIndex, get_signature
+from job.models import Job
+from job.scoring import get_scorer
+
+
+class Command(BaseCommand):
+    help = "Re-score processed jobs with the current keyword settings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of jobs loaded and updated at once",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print the changes, don't write them",
+        )
+
+    @staticmethod
+    def dedup(
+        job: Job, status: str, duplicates: DuplicateIndex, dry_run: bool
+    ) -> tuple[str, Optional[int]]:
+        """
+        Route a job moving to review through the duplicate index, like
+        `process_jobs` does. Jobs already in review are already indexed.
+
+        Args:
+            job: rescored Job instance
+            status: status of the new score
+            duplicates: index of representative jobs
+            dry_run: only look the job up, without adding it to the index
+
+        Returns:
+            tuple[str, Optional[int]]: status and duplicated job primary-key
+        """
+
+        if status != JobStatus.WAITING_FOR_REVIEW:
+            return status, None
+        if job.status == JobStatus.WAITING_FOR_REVIEW:
+            return status, job.duplicate_of_id
+
+        if not dry_run:
+            duplicate_of_id = duplicates.match_or_add(job.pk, job.description)
+        elif signature := get_signature(job.description or ""):
+            duplicate_of_id = duplicates.match(job.pk, signature)
+        else:
+            duplicate_of_id = None
+
+        if duplicate_of_id is None:
+            return status, None
+
+        return JobStatus.DUPLICATE, duplicate_of_id
+
+    @no_translations
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+        scorer = get_scorer()
+        counters = JobCounters()
+        duplicates = DuplicateIndex()
+
+        jobs = (
+            Job.objects.filter(
+                status__in=[
+                    JobStatus.WAITING_FOR_REVIEW,
+                    JobStatus.REJECTED,
+                    JobStatus.DUPLICATE,
+                ]
+            )
+            .select_related("description_content")
+            .only(
+                "pk",
+                "title",
+                "description_content__text",
+                "points",
+                "status",
+                "duplicate_of",
+            )
+        )
+
+        last_pk, scanned, changed = 0, 0, 0
+        while True:
+            # keyset pagination, only one batch of jobs is loaded at a time
+            batch = list(jobs.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+            if not batch:
+                break
+
+            last_pk = batch[-1].pk
+            scanned += len(batch)
+
+            changed_jobs = []
+            for job in batch:
+                score = scorer.score(job.title, job.description)
+                status, duplicate_of_id = self.dedup(
+                    job, score.status, duplicates, dry_run
+                )
+                if (job.points, job.status, job.duplicate_of_id) == (
+                    score.points,
+                    status,
+                    duplicate_of_id,
+                ):
+                    continue
+
+                if dry_run:
+                    self.stdout.write(
+                        f"#{job.pk} {job.title}: "
+                        f"{job.points} -> {score.points}, "
+                        f"{job.status} -> {status}"
+                    )
+
+                counters.move_status(job.status, status)
+                job.points = score.points
+                job.status = status
+                job.duplicate_of_id = duplicate_of_id
+                job.updated_at = timezone.now()
+                changed_jobs.append(job)
+
+            changed += len(changed_jobs)
+            if changed_jobs and not dry_run:
+                Job.objects.bulk_update(
+                    changed_jobs, ["points", "status", "duplicate_of", "updated_at"]
+                )
+                counters.flush()
+
+        if dry_run:
+            self.stdout.write(f"{changed} of {scanned} jobs would change")
+            return
+
+        self.stdout.write(f"{changed} of {scanned} jobs updated")
@@ -0,0 +1,163 @@
+import logging
+import os
+from contextlib import contextmanager
+
+from celery.signals import worker_process_shutdown, worker_ready
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+LINKEDIN_REQUEST_SECONDS = Histogram(
+    "relohub_linkedin_request_seconds",
+    "Duration of Linkedin requests, throttling aside",
+    ["method", "account", "proxy"],
+)
+LINKEDIN_REQUEST_ERRORS = Counter(
+    "relohub_linkedin_request_errors",
+    "Failed Linkedin requests",
+    ["method", "account", "proxy", "error"],
+)
+LINKEDIN_REQUEST_RETRIES = Counter(
+    "relohub_linkedin_request_retries",
+    "Linkedin requests retried after a JSONDecodeError",
+    ["method", "account", "proxy"],
+)
+LINKEDIN_THROTTLE_SECONDS = Histogram(
+    "relohub_linkedin_throttle_seconds",
+    "Time spent waiting for the Linkedin rate limits",
+    ["account", "proxy"],
+)
+
+SEARCH_PAGES = Histogram(
+    "relohub_search_pages",
+    "Pages of results fetched per job search",
+    buckets=[1, 2, 3, 5, 10, 20],
+)
+JOBS_CREATED = Counter("relohub_jobs_created", "Jobs created by job searches")
+JOBS_UPDATED = Counter(
+    "relohub_jobs_updated", "Jobs updated by the job pipeline", ["task"]
+)
+
+SCORING_SECONDS = Histogram(
+    "relohub_scoring_seconds",
+    "Duration of the relocation scoring of a job",
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25],
+)
+LOGO_DOWNLOAD_SECONDS = Histogram(
+    "relohub_logo_download_seconds", "Duration of company logo downloads"
+)
+DB_WRITE_SECONDS = Histogram(
+    "relohub_db_write_seconds", "Duration of database writes of tasks", ["task"]
+)
+
+
+@contextmanager
+def linkedin_request(method: str, account):
+    """
+    Measure a Linkedin request, count it as failed if it raises
+
+    Args:
+        method: Linkedin client method name
+        account: LinkedinAccount making the request
+    """
+
+    labels = {
+        "method": method,
+        "account": account.pk,
+        "proxy": account.proxy_id or "",
+    }
+    try:
+        with LINKEDIN_REQUEST_SECONDS.labels(**labels).time():
+            yield
+    except Exception as e:
+        LINKEDIN_REQUEST_ERRORS.labels(**labels, error=type(e).__name__).inc()
+        raise
+
+
+class QueueDepthCollector(Collector):
+    """
+    Jobs per status and depth of the work queues, read at scrape time from
+    JobStatusCount and redis
+    """
+
+    def collect(self):
+        from job.models import JobStatusCount
+        from job.queues import AccountQueue, PendingJobs
+
+        jobs = GaugeMetricFamily("relohub_jobs", "Jobs per status", labels=["status"])
+        for status, count in JobStatusCount.objects.values_list("status", "count"):
+            jobs.add_metric([status], count)
+        yield jobs
+
+        try:
+            pending_jobs = GaugeMetricFamily(
+                "relohub_pending_jobs",
+                "New jobs waiting to be processed",
+                value=len(PendingJobs()),
+            )
+            account_queues = GaugeMetricFamily(
+                "relohub_account_queue_depth",
+                "Tasks queued per Linkedin account",
+                labels=["account"],
+            )
+            for account_pk in AccountQueue.queued_accounts():
+                account_queues.add_metric(
+                    [str(account_pk)], len(AccountQueue(account_pk))
+                )
+        except (ImproperlyConfigured, RedisError):
+            logger.exception("Failed to read the queue depths")
+            return
+
+        yield pending_jobs
+        yield account_queues
+
+
+def get_registry() -> CollectorRegistry:
+    """
+    Registry to expose, metrics of all processes are aggregated if
+    PROMETHEUS_MULTIPROC_DIR is set, like for prefork workers
+
+    Returns:
+        CollectorRegistry: registry with the process metrics and queue depths
+    """
+
+    registry = CollectorRegistry()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(REGISTRY)
+    registry.register(QueueDepthCollector())
+
+    return registry
+
+
+@worker_ready.connect
+def start_worker_metrics_server(**kwargs):
+    if settings.PROMETHEUS_WORKER_PORT is None:
+        return
+
+    try:
+        start_http_server(settings.PROMETHEUS_WORKER_PORT, registry=get_registry())
+    except OSError:
+        # another worker node of the host already serves the metrics
+        logger.warning(
+            "Metrics server port %s is in use", settings.PROMETHEUS_WORKER_PORT
+        )
+
+
+@worker_process_shutdown.connect
+def mark_worker_process_dead(pid=None, **kwargs):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
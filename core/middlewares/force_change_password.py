@@ -1,24 +1,54 @@
+from hashlib import sha256
+
 from django.contrib import messages
+from django.core.cache import cache
 from django.http import HttpRequest
 from django.shortcuts import redirect, reverse
 from django.utils.deprecation import MiddlewareMixin
 
+DEFAULT_PASSWORD = "(#ChangeMe!)"
+
 
 class ForceDefaultAdminToChangePassword(MiddlewareMixin):
     """
     Middleware to force default admin to change their password
     """
 
-    @staticmethod
-    def process_request(request: HttpRequest):
+    cache_timeout = 24 * 60 * 60
+
+    @classmethod
+    def has_default_password(cls, user) -> bool:
+        """
+        Check if the user still has the default password. The check hashes the
+        password, so its result is cached, keyed on the current password hash:
+        changing the password makes a new key.
+
+        Args:
+            user: superuser to check
+
+        Returns:
+            bool: True if the user has the default password
+        """
+
+        password_digest = sha256(user.password.encode()).hexdigest()
+        key = f"core:default-password:{user.pk}:{password_digest}"
+
+        has_default_password = cache.get(key)
+        if has_default_password is None:
+            has_default_password = user.check_password(DEFAULT_PASSWORD)
+            cache.set(key, has_default_password, timeout=cls.cache_timeout)
+
+        return has_default_password
+
+    def process_request(self, request: HttpRequest):
         if not request.user.is_superuser:
             return
 
         destination = reverse("admin:password_change")
+        if request.path.startswith(destination):
+            return
 
-        if request.user.check_password("(#ChangeMe!)") and not request.path.startswith(
-            destination
-        ):
+        if self.has_default_password(request.user):
             messages.warning(
                 request, "First things first! Please change your password."
             )
@@ -3,6 +3,7 @@ from django.db.models import F
 from django.utils.deconstruct import deconstructible
 from django.utils.translation import gettext_lazy as _
 
+from core import lookups  # noqa: F401, registers custom lookups
 from core.choices import ModelActionChoicesBase
 from core.utils import to_global_id
 
@@ -0,0 +1,22 @@
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from redis import Redis
+
+
+def get_redis_connection() -> Redis:
+    """
+    Get a redis client connected to the default cache server
+
+    Raises:
+        ImproperlyConfigured: If the default cache is not a redis cache
+
+    Returns:
+        Redis: redis client
+    """
+
+    cache = caches["default"]
+    if not isinstance(cache, RedisCache):
+        raise ImproperlyConfigured("Default cache backend is not RedisCache.")
+
+    return cache._cache.get_client(write=True)
@@ -0,0 +1,21 @@
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+# tests never touch the configured redis, which is shared with celery and
+# holds the work queues, checkpoints and rate limits
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Test runner using an in-memory cache, tests clear and fill it freely
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_override = override_settings(CACHES=TEST_CACHES)
+        self.cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_override.disable()
+        super().teardown_test_environment(**kwargs)
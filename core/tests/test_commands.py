@@ -0,0 +1,161 @@
+from functools import partial
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from job import JobStatus
+from job.dedup import DuplicateIndex, get_signature
+from job.models import Job, JobLocation
+
+
+@patch(
+    "core.management.commands.rescore_jobs.DuplicateIndex",
+    partial(DuplicateIndex, persistent=False),
+)
+class RescoreJobsCommandTestCase(TestCase):
+
+    def setUp(self):
+        location = JobLocation.objects.create(
+            title="TEST LOCATION",
+            iso_code="TS",
+            linkedin_geo_id="1234",
+            flag_emoji=":TS:",
+        )
+        self.stale_job = Job.objects.create(
+            title="Developer",
+            linkedin_id="1",
+            description="Relocation package",
+            status=JobStatus.REJECTED,
+            location=location,
+        )
+        self.scored_job = Job.objects.create(
+            title="Developer",
+            linkedin_id="2",
+            description="Visa",
+            points=1,
+            status=JobStatus.WAITING_FOR_REVIEW,
+            location=location,
+        )
+        self.approved_job = Job.objects.create(
+            title="Developer",
+            linkedin_id="3",
+            description="Relocation package",
+            status=JobStatus.APPROVED,
+            location=location,
+        )
+
+    def test_rescore_jobs(self):
+        out = StringIO()
+        call_command("rescore_jobs", batch_size=1, stdout=out)
+
+        self.stale_job.refresh_from_db()
+        self.assertEqual(self.stale_job.points, 5)
+        self.assertEqual(self.stale_job.status, JobStatus.WAITING_FOR_REVIEW)
+
+        self.approved_job.refresh_from_db()
+        self.assertEqual(self.approved_job.points, 0)
+        self.assertEqual(self.approved_job.status, JobStatus.APPROVED)
+
+        self.assertIn("1 of 2 jobs updated", out.getvalue())
+
+    def test_rescore_jobs_through_duplicates(self):
+        duplicate = Job.objects.create(
+            title="Developer",
+            linkedin_id="4",
+            description="Relocation package",
+            status=JobStatus.DUPLICATE,
+            duplicate_of=self.approved_job,
+            location=self.approved_job.location,
+        )
+        index = DuplicateIndex(persistent=False)
+        index.add(self.approved_job.pk, get_signature("Relocation package"))
+
+        with patch(
+            "core.management.commands.rescore_jobs.DuplicateIndex", return_value=index
+        ):
+            call_command("rescore_jobs", stdout=StringIO())
+
+        # jobs moving to review are matched with the representative jobs
+        self.stale_job.refresh_from_db()
+        self.assertEqual(self.stale_job.status, JobStatus.DUPLICATE)
+        self.assertEqual(self.stale_job.duplicate_of, self.approved_job)
+
+        duplicate.refresh_from_db()
+        self.assertEqual(duplicate.points, 5)
+        self.assertEqual(duplicate.status, JobStatus.DUPLICATE)
+        self.assertEqual(duplicate.duplicate_of, self.approved_job)
+
+    def test_rescore_jobs_dry_run(self):
+        out = StringIO()
+        call_command("rescore_jobs", dry_run=True, stdout=out)
+
+        self.stale_job.refresh_from_db()
+        self.assertEqual(self.stale_job.points, 0)
+        self.assertEqual(self.stale_job.status, JobStatus.REJECTED)
+
+        self.assertIn(f"#{self.stale_job.pk} Developer: 0 -> 5", out.getvalue())
+        self.assertIn("1 of 2 jobs would change", out.getvalue())
+
+
+class BenchmarkIndexesCommandTestCase(TransactionTestCase):
+
+    def setUp(self):
+        # the test database, under an alias marked as a scratch database
+        scratch = {**connections.settings[DEFAULT_DB_ALIAS], "SCRATCH": True}
+        patcher = patch.dict(connections.settings, {"scratch": scratch})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(connections.close_all)
+
+    @override_settings(DEBUG=True)
+    def test_benchmark_indexes(self):
+        out = StringIO()
+        call_command(
+            "benchmark_indexes",
+            database="scratch",
+            yes=True,
+            rows=30,
+            batch_size=20,
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        self.assertIn("Seeded 30 of 30 jobs", output)
+        self.assertIn("Without indexes:", output)
+        self.assertIn("With indexes:", output)
+        self.assertIn("job_status_active_created_idx", output)
+        self.assertFalse(JobLocation.objects.exists())
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(DEBUG=True)
+    def test_seeded_jobs_creation_dates(self):
+        call_command(
+            "benchmark_indexes",
+            database="scratch",
+            yes=True,
+            rows=30,
+            batch_size=20,
+            keep=True,
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(Job.objects.values("created_at").distinct().count(), 30)
+
+    def test_requires_confirmation(self):
+        with self.assertRaisesMessage(CommandError, "DEBUG off"):
+            call_command("benchmark_indexes", database="scratch", yes=True)
+
+        with override_settings(DEBUG=True):
+            with self.assertRaisesMessage(CommandError, "--yes"):
+                call_command("benchmark_indexes", database="scratch")
+
+            with self.assertRaisesMessage(CommandError, "Unknown database"):
+                call_command("benchmark_indexes", database="other", yes=True)
+
+            with self.assertRaisesMessage(CommandError, "scratch database"):
+                call_command("benchmark_indexes", database="default", yes=True)
+
+        self.assertFalse(JobLocation.objects.exists())
@@ -0,0 +1,19 @@
+from django.db import NotSupportedError
+from django.test import TestCase
+
+from core.lookups import to_boolean_mode_terms
+from job.models import JobDescription
+
+
+class FullTextSearchTestCase(TestCase):
+
+    def test_to_boolean_mode_terms(self):
+        self.assertEqual(to_boolean_mode_terms("python dev"), ["+python*", "+dev*"])
+        self.assertEqual(
+            to_boolean_mode_terms('-"visa" (relocation)*'), ["+visa*", "+relocation*"]
+        )
+        self.assertEqual(to_boolean_mode_terms(" +- "), [])
+
+    def test_search_lookup_is_mysql_only(self):
+        with self.assertRaises(NotSupportedError):
+            list(JobDescription.objects.filter(text__search="+visa*"))
@@ -0,0 +1,109 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from redis.exceptions import RedisError
+
+from job import JobStatus
+from job.models import JobStatusCount
+from linkedin.models import LinkedinAccount
+from user.models import User
+
+
+class MetricsViewTest(TestCase):
+
+    def setUp(self):
+        self.client.force_login(
+            User.objects.create_user(username="staff", is_staff=True)
+        )
+
+    @patch("job.queues.AccountQueue")
+    @patch("job.queues.PendingJobs")
+    def test_metrics(self, pending_mock, queue_mock):
+        JobStatusCount.objects.create(status=JobStatus.WAITING_FOR_REVIEW, count=3)
+        pending_mock.return_value.__len__.return_value = 7
+        queue_mock.queued_accounts.return_value = [1]
+        queue_mock.return_value.__len__.return_value = 2
+
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn('relohub_jobs{status="WAIT_FOR_REVIEW"} 3.0', content)
+        self.assertIn("relohub_pending_jobs 7.0", content)
+        self.assertIn('relohub_account_queue_depth{account="1"} 2.0', content)
+        self.assertIn("relohub_linkedin_request_seconds", content)
+
+    @patch("job.queues.get_redis_connection", side_effect=RedisError)
+    def test_metrics_without_redis(self, redis_mock):
+        with self.assertLogs("core.metrics", "ERROR"):
+            response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn("relohub_jobs", content)
+        self.assertNotIn("relohub_pending_jobs ", content)
+
+    def test_metrics_staff_only(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+        self.client.force_login(User.objects.create_user(username="user"))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+    @override_settings(METRICS_AUTH_TOKEN="secret")
+    def test_metrics_token(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+        response = self.client.get(
+            reverse("metrics"), headers={"Authorization": "Bearer secret"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+@patch("linkedin.models.sleep")
+@patch("linkedin.models.throttle")
+class LinkedinRequestMetricsTest(TestCase):
+
+    def setUp(self):
+        self.account = LinkedinAccount.objects.create(
+            username="user", password="pass", last_used=timezone.now()
+        )
+        self.labels = {"method": "get_job", "account": str(self.account.pk)}
+
+    def get_sample(self, name: str, **labels):
+        return (
+            REGISTRY.get_sample_value(name, {**self.labels, "proxy": "", **labels}) or 0
+        )
+
+    @patch.object(LinkedinAccount, "client", new_callable=MagicMock)
+    def test_retries_and_errors(self, client_mock, throttle_mock, sleep_mock):
+        client_mock.get_job.side_effect = [
+            requests.exceptions.JSONDecodeError("", "", 0),
+            {"jobState": "LISTED"},
+        ]
+        retries = self.get_sample("relohub_linkedin_request_retries_total")
+        errors = self.get_sample(
+            "relohub_linkedin_request_errors_total", error="JSONDecodeError"
+        )
+        requests_count = self.get_sample("relohub_linkedin_request_seconds_count")
+
+        self.assertEqual(self.account.call("get_job", 1), {"jobState": "LISTED"})
+
+        self.assertEqual(
+            self.get_sample("relohub_linkedin_request_retries_total"), retries + 1
+        )
+        self.assertEqual(
+            self.get_sample(
+                "relohub_linkedin_request_errors_total", error="JSONDecodeError"
+            ),
+            errors + 1,
+        )
+        self.assertEqual(
+            self.get_sample("relohub_linkedin_request_seconds_count"),
+            requests_count + 2,
+        )
@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core.middlewares.force_change_password import (
+    DEFAULT_PASSWORD,
+    ForceDefaultAdminToChangePassword,
+)
+from user.models import User
+
+
+class ForceDefaultAdminToChangePasswordTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser(
+            username="admin", password=DEFAULT_PASSWORD
+        )
+        self.client.force_login(self.user)
+
+    def test_redirects_to_password_change(self):
+        destination = reverse("admin:password_change")
+
+        response = self.client.get(reverse("admin:index"))
+        self.assertRedirects(response, destination, fetch_redirect_response=False)
+
+        response = self.client.get(destination)
+        self.assertEqual(response.status_code, 200)
+
+    def test_password_check_is_cached(self):
+        with patch.object(
+            User, "check_password", autospec=True, return_value=True
+        ) as check_mock:
+            for _ in range(3):
+                self.client.get(reverse("admin:index"))
+
+        check_mock.assert_called_once()
+
+    def test_password_change_invalidates_cache(self):
+        self.assertTrue(
+            ForceDefaultAdminToChangePassword.has_default_password(self.user)
+        )
+
+        self.user.set_password("new password")
+        self.user.save()
+        self.client.force_login(self.user)
+
+        self.assertFalse(
+            ForceDefaultAdminToChangePassword.has_default_password(self.user)
+        )
+        response = self.client.get(reverse("admin:index"))
+        self.assertEqual(response.status_code, 200)
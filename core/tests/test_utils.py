@@ -1,15 +1,19 @@
 from base64 import b64decode
 from decimal import Decimal
+from time import sleep
 
 from django.contrib.auth.models import Group
 from django.test import TestCase
 
+from core.exceptions import TimeLimitError
 from core.utils import (
     get_random_hex,
     remove_exponent,
     from_global_id,
     to_global_id,
     intcomma_decorator,
+    time_limit,
+    timestamp_to_datetime,
 )
 from user.models import User
 
@@ -167,3 +171,30 @@ class GlobalIDTestCase(TestCase):
             global_id_group,
             "Global IDs for different instances should be different",
         )
+
+    def test_timestamp_to_datetime(self):
+        expected = timestamp_to_datetime(1618920000)
+        self.assertEqual(
+            expected.isoformat(),
+            "2021-04-20T12:00:00+00:00",
+            "Timestamp should be converted to a UTC datetime",
+        )
+        self.assertEqual(
+            timestamp_to_datetime(1618920000000),
+            expected,
+            "Timestamps in milliseconds should be converted too",
+        )
+        self.assertEqual(timestamp_to_datetime(1618920000.0), expected)
+
+    def test_time_limit(self):
+        with self.assertRaises(TimeLimitError):
+            with time_limit(0.05):
+                sleep(5)
+
+        # the alarm is cleared once the block is done
+        with time_limit(0.05):
+            pass
+        sleep(0.1)
+
+        with time_limit(None):
+            sleep(0.01)
@@ -1,15 +1,21 @@
+import signal
+import threading
 from base64 import b64decode, b64encode
+from contextlib import contextmanager
 from decimal import Decimal
 from functools import wraps
 from hashlib import md5
-from typing import Union
+from typing import Optional, Union
 
+import pytz
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.humanize.templatetags.humanize import intcomma
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.utils import timezone
 
+from core.exceptions import TimeLimitError
+
 
 def get_random_hex():
     """
@@ -148,3 +154,50 @@ def intcomma_decorator(prefix="", suffix=""):
         return wrapper
 
     return inner
+
+
+def timestamp_to_datetime(timestamp: Union[int, float]) -> timezone.datetime:
+    """
+    Convert a unix timestamp to an aware datetime, in seconds or milliseconds
+    like Linkedin timestamps
+
+    Args:
+        timestamp: unix timestamp, in seconds or milliseconds
+
+    Returns:
+        datetime: UTC datetime
+    """
+
+    try:
+        return timezone.datetime.fromtimestamp(timestamp, tz=pytz.UTC)
+    except ValueError:
+        return timezone.datetime.fromtimestamp(timestamp / 1000, tz=pytz.UTC)
+
+
+@contextmanager
+def time_limit(seconds: Optional[float]):
+    """
+    Interrupt the block once it runs longer than `seconds`, with SIGALRM. Only
+    enforced in the main thread, where prefork and solo workers run tasks.
+
+    Args:
+        seconds: time limit, None for no limit
+
+    Raises:
+        TimeLimitError: If the block runs out of time
+    """
+
+    if not seconds or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def interrupt(signum, frame):
+        raise TimeLimitError(f"Time limit of {seconds}s exceeded.")
+
+    previous_handler = signal.signal(signal.SIGALRM, interrupt)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
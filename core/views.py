@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from core.metrics import get_registry
+
+
+@require_GET
+def metrics(request):
+    """
+    Prometheus metrics, behind the METRICS_AUTH_TOKEN bearer token, or only for
+    staff users if it isn't set
+    """
+
+    token = settings.METRICS_AUTH_TOKEN
+    if token:
+        allowed = request.headers.get("Authorization") == f"Bearer {token}"
+    else:
+        allowed = request.user.is_staff
+
+    if not allowed:
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
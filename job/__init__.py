@@ -11,3 +11,4 @@ class JobStatus(TextChoices):
     LISTED = "LISTED", _("Listed")
     REJECTED = "REJECTED", _("Rejected")
     EXPIRED = "EXPIRED", _("Expired")
+    DUPLICATE = "DUPLICATE", _("Duplicate")
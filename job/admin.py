@@ -1,42 +1,36 @@
 from django.contrib import admin
 
-from core.admin import BaseModelAdmin
-from core.utils import remove_exponent_decorator
-from job.models import Job, JobLocation, JobTitle, Company, JobSkill  # noqa
+from core.admin import BaseModelAdmin, JobsCountAdminMixin
+from job.models import (  # noqa
+    Job,
+    JobLocation,
+    JobTitle,
+    Company,
+    JobSkill,
+    JobStatusCount,
+)
 
 
 @admin.register(Company)
-class CompanyAdmin(BaseModelAdmin):
+class CompanyAdmin(JobsCountAdminMixin, BaseModelAdmin):
     list_display = ["name", "universal_name", "linkedin_id", "jobs_count"]
     search_fields = ["name", "universal_name"]
 
-    @remove_exponent_decorator
-    def jobs_count(self, obj):
-        return obj.jobs.count()
-
 
 @admin.register(JobTitle)
-class JobTitleAdmin(BaseModelAdmin):
+class JobTitleAdmin(JobsCountAdminMixin, BaseModelAdmin):
     list_display = ["title", "linkedin_id", "jobs_count", "is_active"]
     search_fields = ["title", "children__title", "other_names__icontains"]
 
-    @remove_exponent_decorator
-    def jobs_count(self, obj):
-        return obj.jobs.count()
-
 
 @admin.register(JobSkill)
-class JobSkillAdmin(BaseModelAdmin):
+class JobSkillAdmin(JobsCountAdminMixin, BaseModelAdmin):
     list_display = ["name", "linkedin_id", "jobs_count"]
     search_fields = ["name", "linkedin_id"]
 
-    @remove_exponent_decorator
-    def jobs_count(self, obj):
-        return obj.jobs.count()
-
 
 @admin.register(JobLocation)
-class JobLocationAdmin(BaseModelAdmin):
+class JobLocationAdmin(JobsCountAdminMixin, BaseModelAdmin):
     list_display = ["title", "linkedin_geo_id", "flag_emoji", "jobs_count", "is_active"]
     search_fields = [
         "title",
@@ -45,19 +39,49 @@ class JobLocationAdmin(BaseModelAdmin):
         "flag_emoji",
     ]
 
-    @remove_exponent_decorator
-    def jobs_count(self, obj):
-        return obj.jobs.count()
-
 
 @admin.register(Job)
 class JobAdmin(BaseModelAdmin):
     list_display = ["id", "title", "company", "location", "full_location", "status"]
     list_filter = ["status", "location", "job_titles"]
     search_fields = [
-        "title__icontains",
-        "description__icontains",
         "company__name",
         "company__universal_name",
     ]
-    autocomplete_fields = ["job_skills", "job_titles", "location"]
+    autocomplete_fields = ["job_skills", "job_titles", "location", "duplicate_of"]
+    exclude = ["description_content", "attributes_content"]
+    readonly_fields = ["description", "attributes"]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).light()
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+
+        # title and description are searched through their full-text indexes
+        if search_term:
+            results |= queryset.search(search_term)
+
+        return results, may_have_duplicates
+
+
+@admin.register(JobStatusCount)
+class JobStatusCountAdmin(admin.ModelAdmin):
+    """
+    Read-only, counters are only written by the job pipeline and
+    `reconcile_job_counters`
+    """
+
+    list_display = ["status", "count"]
+    readonly_fields = ["status", "count"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
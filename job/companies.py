@@ -0,0 +1,125 @@
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from linkedin_api.linkedin import get_id_from_urn
+
+from core.exceptions import NotValidCompanyError
+from job.models import Company
+
+
+def parse_company_data(job_data: dict) -> tuple[str, dict]:
+    """
+    Get linkedin id, name and universal name of the company of a job
+
+    Args:
+        job_data: Job data fetched from Linkedin
+
+    Raises:
+        NotValidCompanyError: If the job has no valid company
+
+    Returns:
+        tuple[str, dict]: company linkedin id and fields
+    """
+
+    company_data = job_data["company"]
+
+    if company_data is None:
+        raise NotValidCompanyError
+
+    universal_name = company_data["universalName"]
+    if universal_name is None:
+        raise NotValidCompanyError
+
+    return get_id_from_urn(company_data["entityUrn"]), {
+        "name": company_data["name"],
+        "universal_name": universal_name,
+    }
+
+
+class CompanyResolver:
+    """
+    Resolves companies of a batch of jobs. Companies are looked up in a
+    per-batch dict, then in the cache, and the rest are fetched with one
+    `linkedin_id__in` query, missing ones are created with one `bulk_create`.
+    """
+
+    def __init__(self):
+        self.companies: dict[str, Company] = {}
+
+    def prefetch(self, jobs_data: Iterable[Optional[dict]]):
+        """
+        Resolve companies of all jobs at once
+
+        Args:
+            jobs_data: Job data fetched from Linkedin
+        """
+
+        wanted = {}
+        for job_data in jobs_data:
+            try:
+                linkedin_id, fields = parse_company_data(job_data)
+            except (NotValidCompanyError, AttributeError, KeyError, TypeError):
+                continue
+
+            if linkedin_id not in self.companies:
+                wanted[linkedin_id] = fields
+
+        if not wanted:
+            return
+
+        cached = cache.get_many([Company.get_cache_key(i) for i in wanted])
+        for company in cached.values():
+            self.companies[company.linkedin_id] = company
+            wanted.pop(company.linkedin_id, None)
+
+        if not wanted:
+            return
+
+        companies = {
+            company.linkedin_id: company
+            for company in Company.objects.filter(linkedin_id__in=wanted)
+        }
+
+        if missing := wanted.keys() - companies.keys():
+            Company.objects.bulk_create(
+                [
+                    Company(linkedin_id=linkedin_id, **wanted[linkedin_id])
+                    for linkedin_id in missing
+                ],
+                ignore_conflicts=True,
+            )
+            companies.update(
+                {
+                    company.linkedin_id: company
+                    for company in Company.objects.filter(linkedin_id__in=missing)
+                }
+            )
+
+        self.companies.update(companies)
+        cache.set_many(
+            {
+                Company.get_cache_key(company.linkedin_id): company
+                for company in companies.values()
+            },
+            timeout=Company.CACHE_TIMEOUT,
+        )
+
+    def resolve(self, job_data: dict) -> Company:
+        """
+        Resolve company of the job
+
+        Args:
+            job_data: Job data fetched from Linkedin
+
+        Raises:
+            NotValidCompanyError: If the job has no valid company
+
+        Returns:
+            Company: resolved company instance
+        """
+
+        linkedin_id, _ = parse_company_data(job_data)
+        if linkedin_id not in self.companies:
+            self.prefetch([job_data])
+
+        return self.companies[linkedin_id]
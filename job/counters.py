@@ -0,0 +1,130 @@
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+from django.db.models import Count, F
+
+from job import JobStatus
+from job.models import Company, Job, JobLocation, JobSkill, JobStatusCount, JobTitle
+
+# models with a denormalized `jobs_count`, all related to Job as `jobs`
+COUNTED_MODELS = [Company, JobTitle, JobSkill, JobLocation]
+
+
+class JobCounters:
+    """
+    Changes of the denormalized job counters, collected while a batch of jobs
+    is changed and applied at `flush`, with one UPDATE per model and delta.
+    Status changes saved with `Job.save` are counted by the model, anything
+    else changing jobs outside the pipeline drifts the counters, which is
+    corrected by `recount_jobs`.
+    """
+
+    def __init__(self):
+        self.counts: dict[type, Counter] = defaultdict(Counter)
+        self.statuses = Counter()
+
+    def add(self, model: type, pk: Optional[int], delta: int = 1):
+        if pk is not None:
+            self.counts[model][pk] += delta
+
+    def add_status(self, status: str, delta: int = 1):
+        self.statuses[status] += delta
+
+    def move_status(self, old: str, new: str, count: int = 1):
+        if old != new:
+            self.statuses[old] -= count
+            self.statuses[new] += count
+
+    def remove_jobs(self, job_pks: Iterable[int]):
+        """
+        Count out jobs which are about to be deleted, with their relations
+
+        Args:
+            job_pks: Job primary-keys
+        """
+
+        job_pks = list(job_pks)
+        jobs = Job.objects.filter(pk__in=job_pks)
+        for location_pk, company_pk, status in jobs.values_list(
+            "location_id", "company_id", "status"
+        ):
+            self.add(JobLocation, location_pk, -1)
+            self.add(Company, company_pk, -1)
+            self.add_status(status, -1)
+
+        relations = [
+            (JobTitle, Job.job_titles.through, "jobtitle_id"),
+            (JobSkill, Job.job_skills.through, "jobskill_id"),
+        ]
+        for model, relation, field in relations:
+            for pk in relation.objects.filter(job_id__in=job_pks).values_list(
+                field, flat=True
+            ):
+                self.add(model, pk, -1)
+
+    def flush(self):
+        for model, counts in self.counts.items():
+            pks_by_delta = defaultdict(list)
+            for pk, delta in counts.items():
+                if delta:
+                    pks_by_delta[delta].append(pk)
+
+            for delta, pks in pks_by_delta.items():
+                model.objects.filter(pk__in=pks).update(
+                    jobs_count=F("jobs_count") + delta
+                )
+
+        if statuses := {k: v for k, v in self.statuses.items() if v}:
+            JobStatusCount.objects.bulk_create(
+                [JobStatusCount(status=status) for status in statuses],
+                ignore_conflicts=True,
+            )
+            for status, delta in statuses.items():
+                JobStatusCount.objects.filter(status=status).update(
+                    count=F("count") + delta
+                )
+
+        self.counts.clear()
+        self.statuses.clear()
+
+
+def recount_jobs() -> int:
+    """
+    Recount jobs per company, title, skill, location and status, and correct
+    the counters which drifted
+
+    Returns:
+        int: count of corrected counters
+    """
+
+    corrected = 0
+    for model in COUNTED_MODELS:
+        drifted = list(
+            model.objects.annotate(actual_count=Count("jobs"))
+            .exclude(jobs_count=F("actual_count"))
+            .only("pk", "jobs_count")
+        )
+        for obj in drifted:
+            obj.jobs_count = obj.actual_count
+
+        model.objects.bulk_update(drifted, ["jobs_count"], batch_size=1000)
+        corrected += len(drifted)
+
+    actual = dict(
+        Job.objects.order_by().values_list("status").annotate(count=Count("pk"))
+    )
+    current = dict(JobStatusCount.objects.values_list("status", "count"))
+    drifted = {
+        status: actual.get(status, 0)
+        for status in JobStatus.values
+        if current.get(status) != actual.get(status, 0)
+    }
+
+    JobStatusCount.objects.bulk_create(
+        [JobStatusCount(status=status) for status in drifted],
+        ignore_conflicts=True,
+    )
+    for status, count in drifted.items():
+        JobStatusCount.objects.filter(status=status).update(count=count)
+
+    return corrected + len(drifted)
@@ -0,0 +1,254 @@
+import random
+import re
+import struct
+from collections import defaultdict
+from hashlib import blake2b
+from typing import Iterable, Optional
+
+from core.redis import get_redis_connection
+from job import JobStatus
+from job.models import Job
+
+# 64 hash functions, split in 8 bands of 8 rows: jobs land in a common bucket
+# with a probability above 1/2 from a Jaccard similarity of about 0.77
+NUM_PERMUTATIONS = 64
+BANDS, ROWS = 8, 8
+SHINGLE_SIZE = 3
+SIMILARITY_THRESHOLD = 0.8
+# a job is only a duplicate of a job still in review or listed, a repost of an
+# expired or rejected job takes its place
+REPRESENTATIVE_STATUSES = [
+    JobStatus.WAITING_FOR_REVIEW,
+    JobStatus.APPROVED,
+    JobStatus.LISTED,
+]
+
+MERSENNE_PRIME = (1 << 61) - 1
+_random = random.Random(0)
+PERMUTATIONS = [
+    (_random.randrange(1, MERSENNE_PRIME), _random.randrange(0, MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+WORDS = re.compile(r"\w+")
+
+
+def get_shingles(text: str) -> set[int]:
+    """
+    Hash the overlapping word n-grams of a text, case and punctuation aside
+
+    Args:
+        text: job description
+
+    Returns:
+        set[int]: 64 bit hashes of the shingles
+    """
+
+    words = WORDS.findall(text.lower())
+    if not words:
+        return set()
+
+    return {
+        int.from_bytes(
+            blake2b(
+                " ".join(words[i : i + SHINGLE_SIZE]).encode(), digest_size=8
+            ).digest()
+        )
+        for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))
+    }
+
+
+def get_signature(text: str) -> Optional[tuple[int, ...]]:
+    """
+    Compute MinHash signature of a text
+
+    Args:
+        text: job description
+
+    Returns:
+        Optional[tuple[int, ...]]: signature, None if the text has no words
+    """
+
+    shingles = get_shingles(text)
+    if not shingles:
+        return None
+
+    return tuple(
+        min((a * shingle + b) % MERSENNE_PRIME for shingle in shingles)
+        for a, b in PERMUTATIONS
+    )
+
+
+def get_similarity(signature: tuple[int, ...], other: tuple[int, ...]) -> float:
+    """
+    Estimate Jaccard similarity of two texts from their signatures
+    """
+
+    return sum(a == b for a, b in zip(signature, other)) / NUM_PERMUTATIONS
+
+
+def get_bucket_keys(signature: tuple[int, ...]) -> list[str]:
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS : (band + 1) * ROWS]
+        digest = blake2b(struct.pack(f"{ROWS}Q", *rows), digest_size=8).hexdigest()
+        keys.append(f"job:dedup:bucket:{band}:{digest}")
+
+    return keys
+
+
+class DuplicateIndex:
+    """
+    LSH index of MinHash signatures of representative job descriptions: a
+    job is only compared to jobs sharing a band of its signature, instead of
+    to all jobs.
+
+    Buckets and signatures are kept in process for a batch of jobs, and in
+    redis to be shared by tasks, unless `persistent` is False.
+    """
+
+    TIMEOUT = 30 * 24 * 60 * 60
+    signature_key_prefix = "job:dedup:signature:"
+
+    def __init__(self, persistent: bool = True):
+        self.persistent = persistent
+        self.buckets: dict[str, set[int]] = defaultdict(set)
+        self.loaded_buckets: set[str] = set()
+        self.signatures: dict[int, tuple[int, ...]] = {}
+        # jobs added by this batch, headed for review but not saved yet
+        self.added: set[int] = set()
+
+    def get_candidates(self, bucket_keys: list[str]) -> set[int]:
+        if self.persistent:
+            missing = [key for key in bucket_keys if key not in self.loaded_buckets]
+            if missing:
+                pipeline = get_redis_connection().pipeline(transaction=False)
+                for key in missing:
+                    pipeline.smembers(key)
+
+                for key, members in zip(missing, pipeline.execute()):
+                    self.buckets[key].update(int(pk) for pk in members)
+                self.loaded_buckets.update(missing)
+
+        return set().union(*(self.buckets[key] for key in bucket_keys))
+
+    def get_signatures(self, job_pks: Iterable[int]) -> dict[int, tuple[int, ...]]:
+        job_pks = list(job_pks)
+
+        if self.persistent:
+            missing = [pk for pk in job_pks if pk not in self.signatures]
+            if missing:
+                values = get_redis_connection().mget(
+                    [f"{self.signature_key_prefix}{pk}" for pk in missing]
+                )
+                for pk, value in zip(missing, values):
+                    if value is not None:
+                        self.signatures[pk] = struct.unpack(
+                            f"{NUM_PERMUTATIONS}Q", value
+                        )
+
+        return {pk: self.signatures[pk] for pk in job_pks if pk in self.signatures}
+
+    def add(self, job_pk: int, signature: tuple[int, ...]):
+        bucket_keys = get_bucket_keys(signature)
+        for key in bucket_keys:
+            self.buckets[key].add(job_pk)
+        self.signatures[job_pk] = signature
+        self.added.add(job_pk)
+
+        if not self.persistent:
+            return
+
+        pipeline = get_redis_connection().pipeline(transaction=False)
+        for key in bucket_keys:
+            pipeline.sadd(key, job_pk)
+            pipeline.expire(key, self.TIMEOUT)
+        pipeline.set(
+            f"{self.signature_key_prefix}{job_pk}",
+            struct.pack(f"{NUM_PERMUTATIONS}Q", *signature),
+            ex=self.TIMEOUT,
+        )
+        pipeline.execute()
+
+    def remove(self, job_pk: int):
+        self.added.discard(job_pk)
+        signature = self.signatures.pop(job_pk, None)
+        if signature is None:
+            return
+
+        bucket_keys = get_bucket_keys(signature)
+        for key in bucket_keys:
+            self.buckets[key].discard(job_pk)
+
+        if self.persistent:
+            pipeline = get_redis_connection().pipeline(transaction=False)
+            for key in bucket_keys:
+                pipeline.srem(key, job_pk)
+            pipeline.delete(f"{self.signature_key_prefix}{job_pk}")
+            pipeline.execute()
+
+    def match_or_add(self, job_pk: int, text: Optional[str]) -> Optional[int]:
+        """
+        Find the representative job which the job duplicates, or add the job to
+        the index as a representative
+
+        Args:
+            job_pk: Job primary-key
+            text: job description
+
+        Returns:
+            Optional[int]: primary-key of the duplicated job, None if the job
+                is not a duplicate
+        """
+
+        signature = get_signature(text or "")
+        if signature is None:
+            return None
+
+        duplicate_of = self.match(job_pk, signature)
+        if duplicate_of is None:
+            self.add(job_pk, signature)
+
+        return duplicate_of
+
+    def match(self, job_pk: int, signature: tuple[int, ...]) -> Optional[int]:
+        """
+        Find the representative job which the job duplicates, without adding
+        the job to the index
+
+        Args:
+            job_pk: Job primary-key
+            signature: signature of the job description
+
+        Returns:
+            Optional[int]: primary-key of the duplicated job, None if the job
+                is not a duplicate
+        """
+
+        candidates = self.get_candidates(get_bucket_keys(signature))
+        candidates.discard(job_pk)
+
+        similarities = {
+            pk: get_similarity(signature, other)
+            for pk, other in self.get_signatures(candidates).items()
+        }
+        # most similar first, ties go to the oldest job
+        matches = sorted(
+            (pk for pk, value in similarities.items() if value >= SIMILARITY_THRESHOLD),
+            key=lambda pk: (-similarities[pk], pk),
+        )
+        if matches:
+            # jobs deleted, expired or rejected since they were indexed are
+            # dropped from the index
+            representatives = self.added.union(
+                Job.objects.filter(
+                    pk__in=[pk for pk in matches if pk not in self.added],
+                    status__in=REPRESENTATIVE_STATUSES,
+                ).values_list("pk", flat=True)
+            )
+            for pk in matches:
+                if pk in representatives:
+                    return pk
+                self.remove(pk)
+
+        return None
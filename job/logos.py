@@ -0,0 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+
+from core import metrics
+from job.models import Company
+
+session = requests.Session()
+session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_maxsize=settings.COMPANY_LOGO_FETCH_CONCURRENCY,
+        max_retries=Retry(total=2, backoff_factor=0.5),
+    ),
+)
+
+
+def get_logo_url(company_data: dict) -> Optional[str]:
+    """
+    Get url of the biggest logo image of a company
+
+    Args:
+        company_data: Company data fetched from Linkedin
+
+    Returns:
+        Optional[str]: logo url, None if company has no logo
+    """
+
+    logo = (company_data.get("logoResolutionResult") or {}).get("vectorImage")
+    if not logo:
+        return None
+
+    biggest_size = list(sorted(logo["artifacts"], key=lambda x: x["width"]))[-1]
+    return logo["rootUrl"] + biggest_size["fileIdentifyingUrlPathSegment"]
+
+
+def get_logo_key(url: str) -> str:
+    """
+    Linkedin signs image urls with an expiring query string, the logo only
+    changes when the rest of the url does
+    """
+
+    return urlsplit(url)._replace(query="", fragment="").geturl()
+
+
+def logo_changed(company: Company, url: str) -> bool:
+    return not company.logo or company.logo_url != get_logo_key(url)
+
+
+def download_logo(url: str) -> Optional[bytes]:
+    try:
+        with metrics.LOGO_DOWNLOAD_SECONDS.time():
+            result = session.get(url, timeout=settings.COMPANY_LOGO_FETCH_TIMEOUT)
+    except requests.RequestException:
+        return None
+
+    return result.content if result.ok else None
+
+
+def store_logo(content: bytes) -> str:
+    """
+    Store a logo by its content hash, identical logos are stored once
+
+    Args:
+        content: image content
+
+    Returns:
+        str: stored file name
+    """
+
+    name = f"company/{sha256(content).hexdigest()}.png"
+    if default_storage.exists(name):
+        return name
+
+    return default_storage.save(name, ContentFile(content))
+
+
+def fetch_logos(logos: list[tuple[int, str]]) -> int:
+    """
+    Download company logos concurrently and store them
+
+    Args:
+        logos: (Company primary-key, logo url) pairs
+
+    Returns:
+        int: count of updated companies
+    """
+
+    with ThreadPoolExecutor(settings.COMPANY_LOGO_FETCH_CONCURRENCY) as executor:
+        contents = executor.map(download_logo, [url for _, url in logos])
+
+    updated = []
+    for (company_pk, url), content in zip(logos, contents):
+        if content is None:
+            continue
+
+        if Company.objects.filter(pk=company_pk).update(
+            logo=store_logo(content),
+            logo_url=get_logo_key(url),
+        ):
+            updated.append(company_pk)
+
+    cache.delete_many(
+        [
+            Company.get_cache_key(linkedin_id)
+            for linkedin_id in Company.objects.filter(pk__in=updated).values_list(
+                "linkedin_id", flat=True
+            )
+        ]
+    )
+
+    return len(updated)
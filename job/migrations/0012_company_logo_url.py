@@ -0,0 +1,60 @@
+# Generated by Django 5.0.4 on 2026-10-18 14:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0011_alter_job_company_alter_job_job_skills_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="company",
+            name="logo_url",
+            field=models.URLField(
+                blank=True, max_length=1024, null=True, verbose_name="logo url"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="job_skills",
+            field=models.ManyToManyField(
+                blank=True,
+                limit_choices_to={"is_active": True},
+                related_name="jobs",
+                to="job.jobskill",
+                verbose_name="job skills",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="job_titles",
+            field=models.ManyToManyField(
+                blank=True,
+                limit_choices_to={"is_active": True, "parent__isnull": True},
+                related_name="jobs",
+                to="job.jobtitle",
+                verbose_name="job titles",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PARTIALLY_PROCEEDED", "Partially Proceeded"),
+                    ("FULLY_PROCEEDED", "Fully Proceeded"),
+                    ("WAIT_FOR_REVIEW", "Waiting For Review"),
+                    ("APPROVED", "Approved"),
+                    ("LISTED", "Listed"),
+                    ("REJECTED", "Rejected"),
+                    ("EXPIRED", "Expired"),
+                ],
+                default="PARTIALLY_PROCEEDED",
+                max_length=32,
+                verbose_name="status",
+            ),
+        ),
+    ]
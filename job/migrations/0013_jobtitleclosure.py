@@ -0,0 +1,77 @@
+# Generated by Django 5.0.4 on 2026-10-18 14:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_job_title_closure(apps, schema_editor):
+    JobTitle = apps.get_model("job", "JobTitle")
+    JobTitleClosure = apps.get_model("job", "JobTitleClosure")
+
+    parents = dict(JobTitle.objects.values_list("pk", "parent_id"))
+
+    links = []
+    for pk in parents:
+        ancestor, depth, seen = pk, 0, set()
+        while ancestor is not None and ancestor not in seen:
+            seen.add(ancestor)
+            links.append(
+                JobTitleClosure(ancestor_id=ancestor, descendant_id=pk, depth=depth)
+            )
+            ancestor, depth = parents.get(ancestor), depth + 1
+
+    JobTitleClosure.objects.bulk_create(links, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0012_company_logo_url"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobTitleClosure",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("depth", models.PositiveIntegerField(verbose_name="depth")),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="descendant_links",
+                        to="job.jobtitle",
+                        verbose_name="ancestor",
+                    ),
+                ),
+                (
+                    "descendant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ancestor_links",
+                        to="job.jobtitle",
+                        verbose_name="descendant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Job Title Closure",
+                "verbose_name_plural": "Job Title Closures",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="jobtitleclosure",
+            constraint=models.UniqueConstraint(
+                fields=("ancestor", "descendant"), name="job_title_closure_unique_link"
+            ),
+        ),
+        migrations.RunPython(build_job_title_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.4 on 2026-10-18 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0013_jobtitleclosure"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["status", "is_active", "created_at"],
+                name="job_status_active_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobtitle",
+            index=models.Index(
+                fields=["is_active", "parent"], name="jobtitle_active_parent_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+FULLTEXT_INDEXES = {
+    "job_title_fulltext_idx": "title",
+    "job_description_fulltext_idx": "description",
+}
+
+
+def create_fulltext_indexes(apps, schema_editor):
+    # FULLTEXT indexes are MySQL only, other databases fall back to LIKE
+    if schema_editor.connection.vendor != "mysql":
+        return
+
+    Job = apps.get_model("job", "Job")
+    for name, column in FULLTEXT_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE FULLTEXT INDEX {schema_editor.quote_name(name)} "
+            f"ON {schema_editor.quote_name(Job._meta.db_table)} "
+            f"({schema_editor.quote_name(column)})"
+        )
+
+
+def drop_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+
+    Job = apps.get_model("job", "Job")
+    for name in FULLTEXT_INDEXES:
+        schema_editor.execute(
+            f"DROP INDEX {schema_editor.quote_name(name)} "
+            f"ON {schema_editor.quote_name(Job._meta.db_table)}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0014_status_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_indexes, drop_fulltext_indexes),
+    ]
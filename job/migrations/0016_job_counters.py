@@ -0,0 +1,108 @@
+# Generated by Django 5.0.4 on 2026-10-18 14:52
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_jobs(apps, schema_editor):
+    Job = apps.get_model("job", "Job")
+    JobStatusCount = apps.get_model("job", "JobStatusCount")
+
+    relations = {
+        "Company": (Job, "company_id"),
+        "JobLocation": (Job, "location_id"),
+        "JobTitle": (Job.job_titles.through, "jobtitle_id"),
+        "JobSkill": (Job.job_skills.through, "jobskill_id"),
+    }
+    for model_name, (relation, field) in relations.items():
+        model = apps.get_model("job", model_name)
+        counts = dict(
+            relation.objects.order_by().values_list(field).annotate(count=Count("pk"))
+        )
+
+        objs = [model(pk=pk, jobs_count=count) for pk, count in counts.items() if pk]
+        model.objects.bulk_update(objs, ["jobs_count"], batch_size=1000)
+
+    JobStatusCount.objects.bulk_create(
+        [
+            JobStatusCount(status=status, count=count)
+            for status, count in Job.objects.order_by()
+            .values_list("status")
+            .annotate(count=Count("pk"))
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0015_job_fulltext_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobStatusCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PARTIALLY_PROCEEDED", "Partially Proceeded"),
+                            ("FULLY_PROCEEDED", "Fully Proceeded"),
+                            ("WAIT_FOR_REVIEW", "Waiting For Review"),
+                            ("APPROVED", "Approved"),
+                            ("LISTED", "Listed"),
+                            ("REJECTED", "Rejected"),
+                            ("EXPIRED", "Expired"),
+                        ],
+                        max_length=32,
+                        unique=True,
+                        verbose_name="status",
+                    ),
+                ),
+                ("count", models.IntegerField(default=0, verbose_name="count")),
+            ],
+            options={
+                "verbose_name": "Job Status Count",
+                "verbose_name_plural": "Job Status Counts",
+            },
+        ),
+        migrations.AddField(
+            model_name="company",
+            name="jobs_count",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="jobs count"
+            ),
+        ),
+        migrations.AddField(
+            model_name="joblocation",
+            name="jobs_count",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="jobs count"
+            ),
+        ),
+        migrations.AddField(
+            model_name="jobskill",
+            name="jobs_count",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="jobs count"
+            ),
+        ),
+        migrations.AddField(
+            model_name="jobtitle",
+            name="jobs_count",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="jobs count"
+            ),
+        ),
+        migrations.RunPython(count_jobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,195 @@
+# Generated by Django 5.0.4 on 2026-10-18 14:56
+
+import json
+import zlib
+from hashlib import sha256
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def encode_attributes(value):
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+    return sha256(encoded).hexdigest(), zlib.compress(encoded)
+
+
+def move_contents(apps, schema_editor):
+    Job = apps.get_model("job", "Job")
+    JobDescription = apps.get_model("job", "JobDescription")
+    JobAttributes = apps.get_model("job", "JobAttributes")
+
+    last_pk = 0
+    while True:
+        jobs = list(
+            Job.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", "description", "attributes")[:BATCH_SIZE]
+        )
+        if not jobs:
+            break
+
+        last_pk = jobs[-1].pk
+        descriptions, attributes = {}, {}
+        for job in jobs:
+            if job.description is not None:
+                digest = sha256(job.description.encode()).hexdigest()
+                descriptions[digest] = JobDescription(
+                    digest=digest, text=job.description
+                )
+                job.description_content_id = digest
+
+            digest, data = encode_attributes(job.attributes)
+            attributes[digest] = JobAttributes(digest=digest, data=data)
+            job.attributes_content_id = digest
+
+        JobDescription.objects.bulk_create(descriptions.values(), ignore_conflicts=True)
+        JobAttributes.objects.bulk_create(attributes.values(), ignore_conflicts=True)
+        Job.objects.bulk_update(jobs, ["description_content", "attributes_content"])
+
+
+def restore_contents(apps, schema_editor):
+    Job = apps.get_model("job", "Job")
+
+    last_pk = 0
+    while True:
+        jobs = list(
+            Job.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .select_related("description_content", "attributes_content")[:BATCH_SIZE]
+        )
+        if not jobs:
+            break
+
+        last_pk = jobs[-1].pk
+        for job in jobs:
+            if job.description_content:
+                job.description = job.description_content.text
+            if job.attributes_content:
+                job.attributes = json.loads(
+                    zlib.decompress(job.attributes_content.data)
+                )
+
+        Job.objects.bulk_update(jobs, ["description", "attributes"])
+
+
+def fulltext_index_operations(model_name, name, column):
+    """
+    Create and drop a MySQL FULLTEXT index, other databases fall back to LIKE
+    """
+
+    def create(apps, schema_editor):
+        if schema_editor.connection.vendor != "mysql":
+            return
+
+        model = apps.get_model("job", model_name)
+        schema_editor.execute(
+            f"CREATE FULLTEXT INDEX {schema_editor.quote_name(name)} "
+            f"ON {schema_editor.quote_name(model._meta.db_table)} "
+            f"({schema_editor.quote_name(column)})"
+        )
+
+    def drop(apps, schema_editor):
+        if schema_editor.connection.vendor != "mysql":
+            return
+
+        model = apps.get_model("job", model_name)
+        schema_editor.execute(
+            f"DROP INDEX {schema_editor.quote_name(name)} "
+            f"ON {schema_editor.quote_name(model._meta.db_table)}"
+        )
+
+    return create, drop
+
+
+create_description_index, drop_description_index = fulltext_index_operations(
+    "JobDescription", "job_description_text_fulltext_idx", "text"
+)
+create_job_description_index, drop_job_description_index = fulltext_index_operations(
+    "Job", "job_description_fulltext_idx", "description"
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0016_job_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobAttributes",
+            fields=[
+                (
+                    "digest",
+                    models.CharField(
+                        max_length=64,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="digest",
+                    ),
+                ),
+                ("data", models.BinaryField(verbose_name="data")),
+            ],
+            options={
+                "verbose_name": "Job Attributes",
+                "verbose_name_plural": "Job Attributes",
+            },
+        ),
+        migrations.CreateModel(
+            name="JobDescription",
+            fields=[
+                (
+                    "digest",
+                    models.CharField(
+                        max_length=64,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="digest",
+                    ),
+                ),
+                ("text", models.TextField(verbose_name="text")),
+            ],
+            options={
+                "verbose_name": "Job Description",
+                "verbose_name_plural": "Job Descriptions",
+            },
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="attributes_content",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="jobs",
+                to="job.jobattributes",
+                verbose_name="attributes",
+            ),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="description_content",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="jobs",
+                to="job.jobdescription",
+                verbose_name="description",
+            ),
+        ),
+        migrations.RunPython(move_contents, restore_contents),
+        # the description full-text index moves to the descriptions table
+        migrations.RunPython(drop_job_description_index, create_job_description_index),
+        migrations.RemoveField(
+            model_name="job",
+            name="attributes",
+        ),
+        migrations.RemoveField(
+            model_name="job",
+            name="description",
+        ),
+        migrations.RunPython(create_description_index, drop_description_index),
+    ]
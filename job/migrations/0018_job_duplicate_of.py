@@ -0,0 +1,64 @@
+# Generated by Django 5.0.4 on 2026-10-18 15:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0017_job_contents"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="duplicate_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicates",
+                to="job.job",
+                verbose_name="duplicate of",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PARTIALLY_PROCEEDED", "Partially Proceeded"),
+                    ("FULLY_PROCEEDED", "Fully Proceeded"),
+                    ("WAIT_FOR_REVIEW", "Waiting For Review"),
+                    ("APPROVED", "Approved"),
+                    ("LISTED", "Listed"),
+                    ("REJECTED", "Rejected"),
+                    ("EXPIRED", "Expired"),
+                    ("DUPLICATE", "Duplicate"),
+                ],
+                default="PARTIALLY_PROCEEDED",
+                max_length=32,
+                verbose_name="status",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="jobstatuscount",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PARTIALLY_PROCEEDED", "Partially Proceeded"),
+                    ("FULLY_PROCEEDED", "Fully Proceeded"),
+                    ("WAIT_FOR_REVIEW", "Waiting For Review"),
+                    ("APPROVED", "Approved"),
+                    ("LISTED", "Listed"),
+                    ("REJECTED", "Rejected"),
+                    ("EXPIRED", "Expired"),
+                    ("DUPLICATE", "Duplicate"),
+                ],
+                max_length=32,
+                unique=True,
+                verbose_name="status",
+            ),
+        ),
+    ]
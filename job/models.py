@@ -1,9 +1,21 @@
-import pytz
-from django.db import models
-from django.utils import timezone
+import json
+import operator
+import zlib
+from functools import cached_property, reduce
+from hashlib import sha256
+from typing import Any, Iterable, Optional
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connections, models, transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
+from core.lookups import to_boolean_mode_terms
 from core.models import ModelWithMetadata, ImageFieldRename
+from core.utils import timestamp_to_datetime
 from job import JobStatus
 
 
@@ -21,15 +33,42 @@ class Company(ModelWithMetadata):
         db_index=True,
     )
     logo = models.ImageField(_("logo"), upload_to="company/", null=True, blank=True)
+    logo_url = models.URLField(_("logo url"), max_length=1024, null=True, blank=True)
+    jobs_count = models.IntegerField(_("jobs count"), default=0, editable=False)
+
+    CACHE_TIMEOUT = 60 * 60
 
     def __str__(self):
         return f"{self.name} #{self.linkedin_id}"
 
+    @staticmethod
+    def get_cache_key(linkedin_id: str) -> str:
+        return f"job:company:{linkedin_id}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        cache.delete(self.get_cache_key(self.linkedin_id))
+
+
+@receiver(post_delete, sender=Company)
+def uncache_deleted_company(sender, instance: Company, **kwargs):
+    """
+    Keep the company resolver from returning a deleted company
+    """
+
+    cache.delete(Company.get_cache_key(instance.linkedin_id))
+
 
 class JobTitle(ModelWithMetadata):
     class Meta:
         verbose_name = _("Job Title")
         verbose_name_plural = _("Job Titles")
+        indexes = [
+            models.Index(
+                fields=["is_active", "parent"],
+                name="jobtitle_active_parent_idx",
+            ),
+        ]
 
     title = models.CharField(_("title"), max_length=128)
     parent = models.ForeignKey(
@@ -53,6 +92,32 @@ class JobTitle(ModelWithMetadata):
         unique=True,
         db_index=True,
     )
+    jobs_count = models.IntegerField(_("jobs count"), default=0, editable=False)
+
+    CACHE_TIMEOUT = 24 * 60 * 60
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # parent as loaded, DEFERRED if the parent is deferred
+        instance._original_parent_id = dict(zip(field_names, values)).get(
+            "parent_id", DEFERRED
+        )
+        return instance
+
+    def clean(self):
+        super().clean()
+
+        if (
+            self.pk is not None
+            and self.parent_id is not None
+            and JobTitleClosure.objects.filter(
+                ancestor_id=self.pk, descendant_id=self.parent_id
+            ).exists()
+        ):
+            raise ValidationError(
+                {"parent": _("Job title can't be a child of itself or its children.")}
+            )
 
     def get_other_names(self):
         return self.other_names.split(";") if self.other_names else []
@@ -65,13 +130,39 @@ class JobTitle(ModelWithMetadata):
         self.save()
 
     def get_children(self, recursive=False):
-
-        children = self.children.all()
         if recursive:
-            for child in children:
-                children = children.union(child.get_children(recursive=True))
+            return JobTitle.objects.filter(
+                ancestor_links__ancestor=self,
+                ancestor_links__depth__gt=0,
+            )
+
+        return self.children.all()
+
+    def get_ancestors(self):
+        return JobTitle.objects.filter(
+            descendant_links__descendant=self,
+            descendant_links__depth__gt=0,
+        ).order_by("descendant_links__depth")
+
+    def get_descendant_linkedin_ids(self) -> list[str]:
+        key = self.get_descendants_cache_key(self.pk)
+        linkedin_ids = cache.get(key)
+
+        if linkedin_ids is None:
+            linkedin_ids = list(
+                self.get_children(recursive=True).values_list("linkedin_id", flat=True)
+            )
+            cache.set(key, linkedin_ids, timeout=self.CACHE_TIMEOUT)
 
-        return children
+        return linkedin_ids
+
+    @staticmethod
+    def get_descendants_cache_key(pk: int) -> str:
+        return f"job:title:{pk}:descendants"
+
+    @classmethod
+    def clear_descendants_cache(cls, pks):
+        cache.delete_many([cls.get_descendants_cache_key(pk) for pk in pks])
 
     def save(self, *args, **kwargs):
         if self.other_names:
@@ -81,12 +172,161 @@ class JobTitle(ModelWithMetadata):
                     names.append(n.strip())
             self.other_names = ";".join(names)
 
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        ancestor_ids = set()
+        if not adding:
+            ancestor_ids.update(self.get_ancestor_ids())
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if adding or self.parent_changed:
+                JobTitleClosure.objects.move(self, adding=adding)
+
+        if "parent_id" not in self.get_deferred_fields():
+            self._original_parent_id = self.parent_id
+
+        ancestor_ids.update(self.get_ancestor_ids())
+        self.clear_descendants_cache(ancestor_ids)
+
+    @property
+    def parent_changed(self) -> bool:
+        """
+        Whether the parent was changed since the title was loaded, a parent
+        which was deferred and then loaded or set counts as changed
+        """
+
+        if "parent_id" in self.get_deferred_fields():
+            return False
+
+        original_parent_id = getattr(self, "_original_parent_id", DEFERRED)
+        return original_parent_id is DEFERRED or self.parent_id != original_parent_id
+
+    def get_ancestor_ids(self) -> list[int]:
+        """
+        Primary-keys of this title and its ancestors
+        """
+
+        return list(
+            JobTitleClosure.objects.filter(descendant=self).values_list(
+                "ancestor_id", flat=True
+            )
+        )
 
     def __str__(self):
         return f"{self.title} #{self.linkedin_id}"
 
 
+class JobTitleClosureQuerySet(models.QuerySet):
+
+    def move(self, job_title: JobTitle, adding=False):
+        """
+        Link a job title, and its subtree, to the ancestors of its current parent
+
+        Args:
+            job_title: moved JobTitle instance
+            adding: whether job_title has just been created
+
+        Raises:
+            ValueError: If parent of job title is the title itself or its descendant
+        """
+
+        if adding:
+            self.create(ancestor=job_title, descendant=job_title, depth=0)
+            subtree = [(job_title.pk, 0)]
+        else:
+            subtree = list(
+                self.filter(ancestor=job_title).values_list("descendant_id", "depth")
+            )
+            subtree_ids = [pk for pk, _ in subtree]
+
+            # unlink the subtree from its old ancestors
+            self.filter(descendant_id__in=subtree_ids).exclude(
+                ancestor_id__in=subtree_ids
+            ).delete()
+
+        if job_title.parent_id is None:
+            return
+
+        ancestors = list(
+            self.filter(descendant_id=job_title.parent_id).values_list(
+                "ancestor_id", "depth"
+            )
+        )
+
+        if job_title.pk in [pk for pk, _ in ancestors]:
+            raise ValueError("Job title can't be a child of itself or its children.")
+
+        self.bulk_create(
+            [
+                JobTitleClosure(
+                    ancestor_id=ancestor_pk,
+                    descendant_id=descendant_pk,
+                    depth=ancestor_depth + descendant_depth + 1,
+                )
+                for ancestor_pk, ancestor_depth in ancestors
+                for descendant_pk, descendant_depth in subtree
+            ]
+        )
+
+
+class JobTitleClosure(models.Model):
+    """
+    Closure table of the JobTitle tree: one row per (ancestor, descendant) pair,
+    including a zero-depth row linking each title to itself
+    """
+
+    class Meta:
+        verbose_name = _("Job Title Closure")
+        verbose_name_plural = _("Job Title Closures")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"],
+                name="job_title_closure_unique_link",
+            )
+        ]
+
+    ancestor = models.ForeignKey(
+        to=JobTitle,
+        verbose_name=_("ancestor"),
+        related_name="descendant_links",
+        on_delete=models.CASCADE,
+    )
+    descendant = models.ForeignKey(
+        to=JobTitle,
+        verbose_name=_("descendant"),
+        related_name="ancestor_links",
+        on_delete=models.CASCADE,
+    )
+    depth = models.PositiveIntegerField(_("depth"))
+
+    objects = JobTitleClosureQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
+
+@receiver(pre_delete, sender=JobTitle)
+def unlink_deleted_job_title(sender, instance: JobTitle, **kwargs):
+    """
+    Children of a deleted title become root titles, unlink them from its ancestors
+    """
+
+    ancestor_ids = instance.get_ancestor_ids()
+    subtree_ids = list(
+        JobTitleClosure.objects.filter(ancestor=instance).values_list(
+            "descendant_id", flat=True
+        )
+    )
+
+    JobTitleClosure.objects.filter(
+        ancestor_id__in=ancestor_ids,
+        descendant_id__in=subtree_ids,
+    ).delete()
+
+    JobTitle.clear_descendants_cache(ancestor_ids)
+
+
 class JobSkill(ModelWithMetadata):
     class Meta:
         verbose_name = _("Job Skill")
@@ -99,6 +339,7 @@ class JobSkill(ModelWithMetadata):
         unique=True,
         db_index=True,
     )
+    jobs_count = models.IntegerField(_("jobs count"), default=0, editable=False)
 
     def __str__(self):
         return f"{self.name} #{self.linkedin_id}"
@@ -117,15 +358,184 @@ class JobLocation(ModelWithMetadata):
         _("flag image"),
         upload_to=ImageFieldRename("job/locations/flags", "iso_code"),
     )
+    jobs_count = models.IntegerField(_("jobs count"), default=0, editable=False)
 
     def __str__(self):
         return f"{self.flag_emoji} {self.title} #{self.linkedin_geo_id}"
 
 
+class JobStatusCount(models.Model):
+    class Meta:
+        verbose_name = _("Job Status Count")
+        verbose_name_plural = _("Job Status Counts")
+
+    status = models.CharField(
+        _("status"),
+        max_length=32,
+        choices=JobStatus.choices,
+        unique=True,
+    )
+    count = models.IntegerField(_("count"), default=0)
+
+    def __str__(self):
+        return f"{self.get_status_display()}: {self.count}"
+
+
+class JobContentQuerySet(models.QuerySet):
+    def store(self, contents: Iterable[Optional[models.Model]]) -> int:
+        """
+        Store contents which are not stored yet, identical contents are stored
+        once and stored contents are never rewritten
+
+        Args:
+            contents: unsaved content instances, None values are skipped
+
+        Returns:
+            int: count of newly stored contents
+        """
+
+        contents = [content for content in contents if content is not None]
+        by_digest = {content.digest: content for content in contents}
+        if not by_digest:
+            return 0
+
+        stored = set(self.filter(digest__in=by_digest).values_list("digest", flat=True))
+        new_contents = [c for digest, c in by_digest.items() if digest not in stored]
+        self.bulk_create(new_contents, ignore_conflicts=True)
+
+        for content in contents:
+            content._state.adding = False
+
+        return len(new_contents)
+
+
+class JobDescription(models.Model):
+    """
+    Job description text, addressed by its hash: reposted jobs share the row
+    """
+
+    class Meta:
+        verbose_name = _("Job Description")
+        verbose_name_plural = _("Job Descriptions")
+
+    digest = models.CharField(_("digest"), max_length=64, primary_key=True)
+    text = models.TextField(_("text"))
+
+    objects = JobContentQuerySet.as_manager()
+
+    def __str__(self):
+        return self.digest
+
+    @classmethod
+    def build(cls, text: str) -> "JobDescription":
+        return cls(digest=sha256(text.encode()).hexdigest(), text=text)
+
+
+class JobAttributes(models.Model):
+    """
+    Job attributes as zlib compressed JSON, addressed by its hash: reposted
+    jobs share the row
+    """
+
+    class Meta:
+        verbose_name = _("Job Attributes")
+        verbose_name_plural = _("Job Attributes")
+
+    digest = models.CharField(_("digest"), max_length=64, primary_key=True)
+    data = models.BinaryField(_("data"))
+
+    objects = JobContentQuerySet.as_manager()
+
+    def __str__(self):
+        return self.digest
+
+    @classmethod
+    def build(cls, value: Any) -> "JobAttributes":
+        encoded = json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+        return cls(digest=sha256(encoded).hexdigest(), data=zlib.compress(encoded))
+
+    @cached_property
+    def value(self) -> Any:
+        return json.loads(zlib.decompress(self.data))
+
+
+class JobQuerySet(models.QuerySet):
+    def light(self):
+        """
+        Jobs without their metadata, for listings
+        """
+
+        return self.defer("metadata")
+
+    def for_pipeline(self):
+        """
+        Jobs with only the fields read or written by the job pipeline
+        """
+
+        return self.only(
+            "linkedin_id",
+            "title",
+            "status",
+            "points",
+            "location",
+            "company",
+            "description_content",
+            "attributes_content",
+            "duplicate_of",
+            "full_location",
+            "listed_at",
+            "on_site",
+            "remote",
+            "hybrid",
+        )
+
+    def search(self, search_term: str):
+        """
+        Search jobs having every word of the term in their title or description,
+        through their FULLTEXT indexes on MySQL
+
+        Args:
+            search_term: search term entered by a user
+
+        Returns:
+            JobQuerySet: matching jobs, none if the term has no words
+        """
+
+        if connections[self.db].vendor == "mysql":
+            # each word is matched on its own, so words can be found in
+            # different fields, and each MATCH uses the index of its table
+            conditions = [
+                models.Q(title__search=term)
+                | models.Q(
+                    description_content__in=JobDescription.objects.filter(
+                        text__search=term
+                    ).values("pk")
+                )
+                for term in to_boolean_mode_terms(search_term)
+            ]
+        else:
+            conditions = [
+                models.Q(title__icontains=word)
+                | models.Q(description_content__text__icontains=word)
+                for word in search_term.split()
+            ]
+
+        if not conditions:
+            return self.none()
+
+        return self.filter(reduce(operator.and_, conditions))
+
+
 class Job(ModelWithMetadata):
     class Meta:
         verbose_name = _("Job")
         verbose_name_plural = _("Jobs")
+        indexes = [
+            models.Index(
+                fields=["status", "is_active", "created_at"],
+                name="job_status_active_created_idx",
+            ),
+        ]
 
     linkedin_id = models.CharField(
         _("linkedin ID"),
@@ -135,14 +545,20 @@ class Job(ModelWithMetadata):
     )
 
     title = models.CharField(_("title"), max_length=256)
-    description = models.TextField(
-        _("description"),
+    description_content = models.ForeignKey(
+        to=JobDescription,
+        verbose_name=_("description"),
+        related_name="jobs",
+        on_delete=models.PROTECT,
         null=True,
         blank=True,
     )
-    attributes = models.JSONField(
-        _("attributes"),
-        default=dict,
+    attributes_content = models.ForeignKey(
+        to=JobAttributes,
+        verbose_name=_("attributes"),
+        related_name="jobs",
+        on_delete=models.PROTECT,
+        null=True,
         blank=True,
     )
     full_location = models.CharField(
@@ -167,6 +583,14 @@ class Job(ModelWithMetadata):
         choices=JobStatus.choices,
         default=JobStatus.PARTIALLY_PROCEEDED,
     )
+    duplicate_of = models.ForeignKey(
+        to="self",
+        verbose_name=_("duplicate of"),
+        related_name="duplicates",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
 
     company = models.ForeignKey(
         to=Company,
@@ -202,18 +626,87 @@ class Job(ModelWithMetadata):
 
     points = models.PositiveIntegerField(_("points"), default=0)
 
+    objects = JobQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.title} @ {self.company or '-'}"
 
+    @property
+    def description(self) -> Optional[str]:
+        if self.description_content_id is None:
+            return None
+        return self.description_content.text
+
+    @description.setter
+    def description(self, text: Optional[str]):
+        self.description_content = (
+            JobDescription.build(text) if text is not None else None
+        )
+
+    @property
+    def attributes(self) -> Any:
+        if self.attributes_content_id is None:
+            return {}
+        return self.attributes_content.value
+
+    @attributes.setter
+    def attributes(self, value: Any):
+        self.attributes_content = JobAttributes.build(value)
+
+    @staticmethod
+    def store_contents(jobs: Iterable["Job"]):
+        """
+        Store descriptions and attributes set on jobs, with one query per
+        content model. Contents loaded from the database are left alone.
+
+        Args:
+            jobs: Job instances
+        """
+
+        jobs = list(jobs)
+        for field_name in ["description_content", "attributes_content"]:
+            field = Job._meta.get_field(field_name)
+            field.related_model.objects.store(
+                content
+                for job in jobs
+                if field.is_cached(job)
+                and (content := field.get_cached_value(job)) is not None
+                and content._state.adding
+            )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # status as loaded, None if deferred
+        instance._original_status = dict(zip(field_names, values)).get("status")
+        return instance
+
     def save(self, *args, **kwargs):
-        if isinstance(self.listed_at, (int, float)):
-            try:
-                self.listed_at = timezone.datetime.fromtimestamp(
-                    self.listed_at, tz=pytz.UTC
-                )
-            except ValueError:
-                self.listed_at = timezone.datetime.fromtimestamp(
-                    self.listed_at / 1000, tz=pytz.UTC
-                )
+        from job.counters import JobCounters
 
-        super().save(*args, **kwargs)
+        if isinstance(self.listed_at, (int, float)):
+            self.listed_at = timestamp_to_datetime(self.listed_at)
+
+        update_fields = kwargs.get("update_fields")
+        original_status = getattr(self, "_original_status", None)
+        status_changed = (
+            original_status is not None
+            and self.status != original_status
+            and (update_fields is None or "status" in update_fields)
+        )
+
+        if not status_changed:
+            self.store_contents([self])
+            super().save(*args, **kwargs)
+            return
+
+        # status changes outside the pipeline, like reviews in the admin
+        with transaction.atomic():
+            self.store_contents([self])
+            super().save(*args, **kwargs)
+
+            counters = JobCounters()
+            counters.move_status(original_status, self.status)
+            counters.flush()
+
+        self._original_status = self.status
@@ -0,0 +1,159 @@
+import json
+from itertools import islice
+from time import time
+from typing import Iterable, Optional
+
+from core.redis import get_redis_connection
+
+
+class AccountQueue:
+    """
+    Redis list of tasks to run with a LinkedinAccount, drained in order by a
+    single `job.run_account_queue` task per account.
+
+    Items are `(task name, task args, timeouts)` triples, `timeouts` counting
+    the runs the task ran out of its time limit. A popped item is kept in a
+    separate list until it's done, so a task interrupted by a time limit or a
+    worker restart can be put back.
+    """
+
+    key_prefix = "job:queue:"
+    unfinished_key_prefix = "job:queue-unfinished:"
+
+    def __init__(self, account_pk: int):
+        self.account_pk = account_pk
+        self.key = f"{self.key_prefix}{account_pk}"
+        self.unfinished_key = f"{self.unfinished_key_prefix}{account_pk}"
+
+    def __len__(self):
+        return get_redis_connection().llen(self.key)
+
+    @classmethod
+    def queued_accounts(cls) -> list[int]:
+        """
+        Get accounts with queued tasks, empty lists are removed by redis itself
+
+        Returns:
+            list[int]: LinkedinAccount primary-keys
+        """
+
+        redis = get_redis_connection()
+
+        accounts = set()
+        for prefix in [cls.key_prefix, cls.unfinished_key_prefix]:
+            for key in redis.scan_iter(match=f"{prefix}*"):
+                accounts.add(int(key.decode().removeprefix(prefix)))
+
+        return sorted(accounts)
+
+    @classmethod
+    def queued_items(cls) -> list[tuple[str, list]]:
+        """
+        Get queued and unfinished items of all accounts
+
+        Returns:
+            list[tuple[str, list]]: task names and args
+        """
+
+        redis = get_redis_connection()
+
+        pipeline = redis.pipeline(transaction=False)
+        for prefix in [cls.key_prefix, cls.unfinished_key_prefix]:
+            for key in redis.scan_iter(match=f"{prefix}*"):
+                pipeline.lrange(key, 0, -1)
+
+        items = []
+        for values in pipeline.execute():
+            for value in values:
+                task_name, args, *_ = json.loads(value)
+                items.append((task_name, args))
+
+        return items
+
+    def extend(self, items: Iterable[tuple[str, list]]):
+        items = [json.dumps([task_name, list(args)]) for task_name, args in items]
+        if items:
+            get_redis_connection().rpush(self.key, *items)
+
+    def push_front(self, task_name: str, args: list, timeouts: int = 0):
+        get_redis_connection().lpush(
+            self.key, json.dumps([task_name, list(args), timeouts])
+        )
+
+    def pop(self) -> Optional[tuple[str, list, int]]:
+        """
+        Pop the next item, it's kept as unfinished until `done` is called
+        """
+
+        item = get_redis_connection().lmove(
+            self.key, self.unfinished_key, "LEFT", "RIGHT"
+        )
+        if item is None:
+            return None
+
+        task_name, args, *timeouts = json.loads(item)
+        return task_name, args, timeouts[0] if timeouts else 0
+
+    def done(self):
+        get_redis_connection().delete(self.unfinished_key)
+
+    def requeue_unfinished(self):
+        """
+        Put unfinished items back to the front of the queue
+        """
+
+        redis = get_redis_connection()
+        while redis.lmove(self.unfinished_key, self.key, "RIGHT", "LEFT"):
+            pass
+
+
+class PendingJobs:
+    """
+    Redis sorted set of newly found Job primary-keys waiting to be processed,
+    scored by the time they were pushed. A set keeps the sweep of
+    `job.run_process_jobs` from queueing a job again while it's pending.
+    Filled by `job.search_jobs` and drained in batches by
+    `job.process_pending_jobs`.
+    """
+
+    key = "job:pending-jobs"
+
+    def __len__(self):
+        return get_redis_connection().zcard(self.key)
+
+    def push(self, job_pks: Iterable[int], chunk: int = 1000) -> int:
+        """
+        Push jobs to the end of the queue, `chunk` of them per command. Jobs
+        already pending keep their place.
+
+        Args:
+            job_pks: Job primary-keys
+            chunk: count of jobs pushed per command
+
+        Returns:
+            int: count of pushed jobs, which were not pending yet
+        """
+
+        redis = get_redis_connection()
+        job_pks = iter(job_pks)
+        now = time()
+
+        pushed = 0
+        while batch := list(islice(job_pks, chunk)):
+            pushed += redis.zadd(self.key, dict.fromkeys(batch, now), nx=True)
+
+        return pushed
+
+    def pop(self, count: int) -> list[int]:
+        """
+        Pop a batch of the oldest pending jobs
+
+        Args:
+            count: maximum count of jobs to pop
+
+        Returns:
+            list[int]: Job primary-keys, empty if nothing is pending
+        """
+
+        job_pks = get_redis_connection().zpopmin(self.key, count)
+        return [int(job_pk) for job_pk, _ in job_pks]
@@ -0,0 +1,156 @@
+import re
+from typing import Iterable, NamedTuple
+
+from django.conf import settings
+
+from job import JobStatus
+
+
+class Score(NamedTuple):
+    points: int
+    keywords: list[str]
+    complements: list[str]
+
+    @property
+    def status(self) -> JobStatus:
+        if self.points > 0:
+            return JobStatus.WAITING_FOR_REVIEW
+        return JobStatus.REJECTED
+
+
+class RelocationScorer:
+    """
+    Scores job titles and descriptions against relocation keywords.
+
+    All keywords and complements are compiled once into a single alternation
+    regex, so each text is scanned in one pass instead of once per keyword.
+
+    Scoring rules:
+        key in description: 1 point
+        key in title: 2 points
+        key+complement in description: 3 points
+        key+complement in title: 5 points
+    """
+
+    def __init__(self, keywords: Iterable[str], complements: Iterable[str]):
+        self.keywords = [key.lower() for key in keywords]
+        self.complements = [complement.lower() for complement in complements]
+
+        terms = set(self.keywords + self.complements)
+
+        # the longest term matching at each position wins the alternation, so
+        # every term that is a substring of a matched term is also present
+        self._implied_terms = {
+            term: frozenset(t for t in terms if t in term) for term in terms
+        }
+
+        alternation = "|".join(
+            map(re.escape, sorted(terms, key=lambda t: (-len(t), t)))
+        )
+        self._pattern = re.compile(f"(?=({alternation}))") if terms else None
+
+    def find_terms(self, text: str) -> set[str]:
+        """
+        Find all keywords and complements present in text
+
+        Args:
+            text: lower-cased text
+
+        Returns:
+            set[str]: terms found in text
+        """
+
+        if self._pattern is None:
+            return set()
+
+        found = set()
+        for matched in set(self._pattern.findall(text)):
+            found.update(self._implied_terms[matched])
+
+        return found
+
+    def score(self, title: str, description: str) -> Score:
+        """
+        Score a job
+
+        Args:
+            title: job title
+            description: job description
+
+        Returns:
+            Score: points and matched keywords and complements
+        """
+
+        title_terms = self.find_terms((title or "").lower())
+        description_terms = self.find_terms((description or "").lower())
+
+        points = 0
+        keywords, complements = [], []
+        description_contains_keywords, title_contains_keywords = False, False
+
+        for key in self.keywords:
+            if key in description_terms:
+                description_contains_keywords = True
+                points += 1
+
+            if key in title_terms:
+                title_contains_keywords = True
+                points += 2
+
+            if (key in description_terms or key in title_terms) and (
+                key not in keywords
+            ):
+                keywords.append(key)
+
+        for complement in self.complements:
+            matched = False
+
+            if description_contains_keywords and (complement in description_terms):
+                matched = True
+                points += 3
+
+            if title_contains_keywords and (complement in title_terms):
+                matched = True
+                points += 5
+
+            if matched and complement not in complements:
+                complements.append(complement)
+
+        return Score(points, keywords, complements)
+
+    def score_many(self, jobs: Iterable[tuple[str, str]]) -> list[Score]:
+        """
+        Score a batch of jobs
+
+        Args:
+            jobs: (title, description) pairs
+
+        Returns:
+            list[Score]: scores in the same order as jobs
+        """
+
+        return [self.score(title, description) for title, description in jobs]
+
+
+_scorers = {}
+
+
+def get_scorer() -> RelocationScorer:
+    """
+    Get a scorer compiled from `LINKEDIN_JOB_DESCRIPTION_KEYWORDS` and
+    `LINKEDIN_JOB_DESCRIPTION_KEYWORD_COMPLEMENTS` settings
+
+    Returns:
+        RelocationScorer: cached scorer instance
+    """
+
+    key = (
+        tuple(settings.LINKEDIN_JOB_DESCRIPTION_KEYWORDS),
+        tuple(settings.LINKEDIN_JOB_DESCRIPTION_KEYWORD_COMPLEMENTS),
+    )
+
+    if key not in _scorers:
+        _scorers.clear()
+        _scorers[key] = RelocationScorer(*key)
+
+    return _scorers[key]
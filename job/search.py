@@ -0,0 +1,138 @@
+from math import ceil
+from typing import Iterator, NamedTuple, Optional
+
+from django.core.cache import cache
+from django.utils import timezone
+
+
+class SearchPlan(NamedTuple):
+    chunk: int
+    limit: int
+    listed_at: int
+
+
+class SearchHistory:
+    """
+    Search history of a (location, job title) pair, kept in cache: the start
+    time of the last search which fetched all of its results (high-water
+    mark), the count of results of recent searches and whether the last one
+    hit its limit. Used to plan the pagination of the next search.
+
+    Search results are ordered by relevance, not by date: only a search which
+    ran out of results is known to have seen every job listed before it
+    started.
+    """
+
+    MIN_CHUNK, MAX_CHUNK = 10, 20
+    MAX_LIMIT = 200
+    MAX_LISTED_AT = 24 * 60 * 60
+    MIN_LISTED_AT = 60 * 60
+    # jobs show up in search results a while after being listed
+    LISTED_AT_MARGIN = 60 * 60
+    RECENT_RUNS = 5
+    TIMEOUT = 7 * 24 * 60 * 60
+
+    def __init__(self, location_pk: int, job_title_pk: int):
+        self.key = f"job:search:history:{location_pk}:{job_title_pk}"
+        history = cache.get(self.key) or {}
+        self.high_water_mark: Optional[float] = history.get("high_water_mark")
+        self.yields: list[int] = history.get("yields", [])
+        self.saturated_limit: Optional[int] = history.get("saturated_limit")
+
+    def plan(self) -> SearchPlan:
+        """
+        Plan the next search: the limit follows the count of results of recent
+        runs and doubles after a run which hit it, and only jobs listed since
+        the high-water mark are searched
+
+        Returns:
+            SearchPlan: page size, limit and listed-at window in seconds
+        """
+
+        limit = self.MAX_LIMIT
+        if self.saturated_limit is not None:
+            # the last run was cut off, its window had more results
+            limit = min(2 * self.saturated_limit, self.MAX_LIMIT)
+        elif self.yields:
+            # expect twice the average yield, rounded up to whole pages
+            expected = 2 * sum(self.yields) / len(self.yields)
+            limit = ceil(expected / self.MIN_CHUNK) * self.MIN_CHUNK
+            limit = min(max(limit, self.MIN_CHUNK), self.MAX_LIMIT)
+
+        listed_at = self.MAX_LISTED_AT
+        if self.high_water_mark is not None:
+            since = timezone.now().timestamp() - self.high_water_mark
+            listed_at = ceil(since) + self.LISTED_AT_MARGIN
+            listed_at = min(max(listed_at, self.MIN_LISTED_AT), self.MAX_LISTED_AT)
+
+        return SearchPlan(min(self.MAX_CHUNK, limit), limit, listed_at)
+
+    def record(self, plan: SearchPlan, fetched: int, started_at: float):
+        """
+        Record the result of a search
+
+        Args:
+            plan: plan of the search
+            fetched: count of results fetched
+            started_at: timestamp of the start of the search
+        """
+
+        self.yields = (self.yields + [fetched])[-self.RECENT_RUNS :]
+
+        if fetched >= plan.limit:
+            # results beyond the limit are left, keep the window where it was
+            self.saturated_limit = plan.limit
+        else:
+            self.saturated_limit = None
+            self.high_water_mark = started_at
+
+        cache.set(
+            self.key,
+            {
+                "high_water_mark": self.high_water_mark,
+                "yields": self.yields,
+                "saturated_limit": self.saturated_limit,
+            },
+            timeout=self.TIMEOUT,
+        )
+
+
+def iter_search_pages(
+    account,
+    location_geo_id: str,
+    job_title_ids: list[str],
+    plan: SearchPlan,
+    offset: int = 0,
+) -> Iterator[tuple[int, list[dict]]]:
+    """
+    Fetch search results page by page, lazily. The caller can stop early by
+    not asking for the next page.
+
+    Args:
+        account: LinkedinAccount to search with
+        location_geo_id: Linkedin geo id of the location
+        job_title_ids: Linkedin ids of the job titles
+        plan: search plan
+        offset: offset of the first page, to resume a search
+
+    Yields:
+        tuple[int, list[dict]]: offset of the next page, and search results
+    """
+
+    chunk, limit, listed_at = plan
+
+    while offset < limit:
+        page = account.call(
+            "search_jobs",
+            location_geo_id=location_geo_id,
+            job_title=job_title_ids,
+            offset=offset,
+            listed_at=listed_at,
+            limit=chunk,
+        )
+        offset += chunk
+
+        yield offset, page
+
+        if len(page) < chunk:
+            return
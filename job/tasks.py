@@ -1,97 +1,327 @@
-from time import sleep
-
-import requests.exceptions
+import json
+from collections import defaultdict
+from datetime import timedelta
+from itertools import cycle, product
+from time import monotonic
+from typing import Optional
+
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.utils.log import get_task_logger
 from celery_singleton import Singleton
-from celery_singleton.exceptions import DuplicateTaskError
 from django.conf import settings
-from django.core.files.base import ContentFile
 from django.utils import timezone
-from linkedin_api.linkedin import default_evade, get_id_from_urn
+from linkedin_api.linkedin import get_id_from_urn
 
-from core.exceptions import NoLinkedinAccountError, NotValidCompanyError
+from core import metrics
+from core.checkpoints import Checkpoint
+from core.exceptions import NotValidCompanyError, TimeLimitError
+from core.utils import time_limit, timestamp_to_datetime
 from job import JobStatus
-from job.models import JobLocation, JobTitle, Job, Company, JobSkill
+from job.companies import CompanyResolver
+from job.counters import JobCounters, recount_jobs
+from job.dedup import DuplicateIndex
+from job.logos import fetch_logos, get_logo_url, logo_changed
+from job.models import Company, JobLocation, JobTitle, Job, JobSkill
+from job.queues import AccountQueue, PendingJobs
+from job.scoring import RelocationScorer, get_scorer
+from job.search import SearchHistory, SearchPlan, iter_search_pages
 from linkedin.models import LinkedinAccount
 from relohub import celery_app as app
 
-
-def get_least_used_account() -> LinkedinAccount:
+logger = get_task_logger(__name__)
+
+# run_process_jobs only picks jobs left unprocessed for longer than this, newer
+# ones are still on their way through the pending jobs queue
+PENDING_JOBS_GRACE_PERIOD = timedelta(hours=1)
+
+# fields of a job updated by process_job
+PROCESSED_JOB_FIELDS = [
+    "company_id",
+    "description_content_id",
+    "attributes_content_id",
+    "full_location",
+    "listed_at",
+    "on_site",
+    "remote",
+    "hybrid",
+    "points",
+    "status",
+    "duplicate_of_id",
+]
+
+# process_jobs writes the changes of this many jobs at once
+PROCESS_JOBS_WRITE_CHUNK = 50
+
+# run_account_queue stops picking new tasks after this many seconds, leaving
+# enough of its time limit for the last task to finish
+ACCOUNT_QUEUE_TIME_BUDGET = 45 * 60
+
+# a queued task running out of its time limit this many times is dropped
+ACCOUNT_QUEUE_MAX_TIMEOUTS = 3
+
+
+def save_search_results(
+    jobs_data: list[dict],
+    location: JobLocation,
+    job_title: JobTitle,
+) -> tuple[list[int], int]:
     """
-    Get least used LinkedinAccount
+    Save search results in bulk: existing jobs are looked up with one query, new
+    ones are inserted with one `bulk_create` and all `Job.job_titles` relations
+    are written with one more bulk insert
 
-    Raises:
-        NoLinkedinAccountError: If there's no active LinkedinAccount available
+    Args:
+        jobs_data: Job search results fetched from Linkedin
+        location: JobLocation the search was made for
+        job_title: JobTitle the search was made for
 
     Returns:
-        LinkedinAccount: The Least used Linkedin Account instance
+        tuple[list[int], int]: primary-keys of created jobs and count of
+            already existing jobs
     """
 
-    linkedin_account: LinkedinAccount = (
-        LinkedinAccount.objects.filter(is_active=True).order_by("last_used").first()
+    titles = {}
+    for _job in jobs_data:
+        job_id = _job["trackingUrn"].split(":")[-1]
+        titles.setdefault(job_id, _job["title"])
+
+    if not titles:
+        return [], 0
+
+    existing_ids = set(
+        Job.objects.filter(linkedin_id__in=titles).values_list("linkedin_id", flat=True)
+    )
+
+    Job.objects.bulk_create(
+        [
+            Job(
+                linkedin_id=job_id,
+                title=title,
+                status=JobStatus.PARTIALLY_PROCEEDED,
+                location=location,
+            )
+            for job_id, title in titles.items()
+            if job_id not in existing_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+    job_pks = dict(
+        Job.objects.filter(linkedin_id__in=titles).values_list("linkedin_id", "pk")
+    )
+
+    JobTitleRelation = Job.job_titles.through
+    linked_pks = set(
+        JobTitleRelation.objects.filter(
+            jobtitle_id=job_title.pk, job_id__in=job_pks.values()
+        ).values_list("job_id", flat=True)
+    )
+    JobTitleRelation.objects.bulk_create(
+        [
+            JobTitleRelation(job_id=job_pk, jobtitle_id=job_title.pk)
+            for job_pk in job_pks.values()
+            if job_pk not in linked_pks
+        ],
+        ignore_conflicts=True,
     )
 
-    if not linkedin_account:
-        raise NoLinkedinAccountError("No active LinkedinAccount available.")
+    created = [
+        job_pk for job_id, job_pk in job_pks.items() if job_id not in existing_ids
+    ]
 
-    linkedin_account.last_used = timezone.now()
-    linkedin_account.save()
+    counters = JobCounters()
+    counters.add(JobLocation, location.pk, len(created))
+    counters.add(JobTitle, job_title.pk, len(job_pks) - len(linked_pks))
+    counters.add_status(JobStatus.PARTIALLY_PROCEEDED, len(created))
+    counters.flush()
 
-    return linkedin_account
+    return created, len(existing_ids)
 
 
-def resolve_company(job_data: dict) -> Company:
+def save_job_skills(jobs_skills: dict[int, dict]):
     """
-    Resolve company of the job, save name, id, universal name and logo to the database
+    Save skills of jobs in bulk: skills are upserted with one `bulk_create` and
+    one id fetch, and all `Job.job_skills` relations with one more bulk insert
 
     Args:
+        jobs_skills: Job skills fetched from Linkedin, by Job primary-key
+    """
+
+    skill_names = {}
+    job_skill_ids = defaultdict(set)
+    for job_pk, job_skills in jobs_skills.items():
+        for skill_data in job_skills.get("skillMatchStatuses", []):
+            skill = skill_data["skill"]
+            linkedin_id = get_id_from_urn(skill["entityUrn"])
+
+            skill_names.setdefault(linkedin_id, skill["name"])
+            job_skill_ids[job_pk].add(linkedin_id)
+
+    if not skill_names:
+        return
+
+    JobSkill.objects.bulk_create(
+        [
+            JobSkill(linkedin_id=linkedin_id, name=name)
+            for linkedin_id, name in skill_names.items()
+        ],
+        ignore_conflicts=True,
+    )
+    skill_pks = dict(
+        JobSkill.objects.filter(linkedin_id__in=skill_names).values_list(
+            "linkedin_id", "pk"
+        )
+    )
+
+    JobSkillRelation = Job.job_skills.through
+    linked = set(
+        JobSkillRelation.objects.filter(job_id__in=job_skill_ids).values_list(
+            "job_id", "jobskill_id"
+        )
+    )
+    relations = {
+        (job_pk, skill_pks[linkedin_id])
+        for job_pk, linkedin_ids in job_skill_ids.items()
+        for linkedin_id in linkedin_ids
+    } - linked
+
+    JobSkillRelation.objects.bulk_create(
+        [
+            JobSkillRelation(job_id=job_pk, jobskill_id=skill_pk)
+            for job_pk, skill_pk in relations
+        ],
+        ignore_conflicts=True,
+    )
+
+    counters = JobCounters()
+    for _, skill_pk in relations:
+        counters.add(JobSkill, skill_pk)
+    counters.flush()
+
+
+def process_job(
+    job: Job,
+    job_data: dict,
+    scorer: RelocationScorer,
+    companies: CompanyResolver,
+    counters: JobCounters,
+    duplicates: DuplicateIndex,
+) -> tuple[set[str], Optional[str]]:
+    """
+    Update a listed job in memory with its data fetched from Linkedin and score
+    it, saving is left to the caller. A job to review which duplicates another
+    one is marked as duplicate instead, so only one of them is reviewed.
+
+    Args:
+        job: Job instance
         job_data: Job data fetched from Linkedin
+        scorer: relocation scorer
+        companies: company resolver of the batch
+        counters: job counters of the batch
+        duplicates: index of representative jobs
+
+    Raises:
+        NotValidCompanyError: If the job has no valid company
 
     Returns:
-        Company: created/updated company instance
+        tuple[set[str], Optional[str]]: changed fields, and company logo url if
+            the logo has changed
     """
 
-    company_data = job_data["company"]
+    try:
+        company = companies.resolve(job_data)
+        logo_url = get_logo_url(job_data["company"])
+    except (AttributeError, KeyError) as e:
+        raise NotValidCompanyError from e
+
+    original = {field: getattr(job, field) for field in PROCESSED_JOB_FIELDS}
+
+    if job.company_id != company.pk:
+        counters.add(Company, job.company_id, -1)
+        counters.add(Company, company.pk)
+    job.company = company
+
+    job.description = job_data["description"]["text"]
+    job.attributes = job_data["description"]["attributesV2"]
+    job.full_location = job_data["location"]["defaultLocalizedName"]
+    job.listed_at = timestamp_to_datetime(job_data["createdAt"])
+
+    for workplace_type in job_data.get("*jobWorkplaceTypes") or job_data.get(
+        "jobWorkplaceTypes", []
+    ):
+        workplace_type = workplace_type.split(":")[-1]
+        if workplace_type == "1":
+            job.on_site = True
+        if workplace_type == "2":
+            job.remote = True
+        if workplace_type == "3":
+            job.hybrid = True
+
+    with metrics.SCORING_SECONDS.time():
+        score = scorer.score(job.title, job.description)
+    status, job.duplicate_of_id = score.status, None
+    if status == JobStatus.WAITING_FOR_REVIEW:
+        job.duplicate_of_id = duplicates.match_or_add(job.pk, job.description)
+        if job.duplicate_of_id is not None:
+            status = JobStatus.DUPLICATE
+
+    counters.move_status(job.status, status)
+    job.points = score.points
+    job.status = status
+
+    changed_fields = {
+        field
+        for field in PROCESSED_JOB_FIELDS
+        if getattr(job, field) != original[field]
+    }
+
+    if logo_url and logo_changed(job.company, logo_url):
+        return changed_fields, logo_url
+
+    return changed_fields, None
+
+
+def dispatch_to_accounts(task, task_args: list[tuple]) -> int:
+    """
+    Spread task calls over the least used accounts, by pushing them to the
+    accounts' work queues, and start draining the queues. Calls already queued
+    on any account are skipped.
 
-    if company_data is None:
-        raise NotValidCompanyError
+    Args:
+        task: task to call, its first argument must be the account primary-key
+        task_args: arguments of each call, without the account primary-key
 
-    universal_name = company_data["universalName"]
-    if universal_name is None:
-        raise NotValidCompanyError
+    Returns:
+        int: count of queued calls
+    """
 
-    company, created = Company.objects.get_or_create(
-        linkedin_id=get_id_from_urn(company_data["entityUrn"]),
-        defaults={
-            "name": company_data["name"],
-            "universal_name": universal_name,
-        },
-    )
+    queued_args = {
+        json.dumps(args[1:])
+        for task_name, args in AccountQueue.queued_items()
+        if task_name == task.name
+    }
+    task_args = [
+        args for args in task_args if json.dumps(list(args)) not in queued_args
+    ]
+    if not task_args:
+        return 0
 
-    if not company.logo:
-        if logo := company_data.get("logoResolutionResult", {}).get("vectorImage", {}):
-            biggest_size = list(sorted(logo["artifacts"], key=lambda x: x["width"]))[-1]
-            url = logo["rootUrl"] + biggest_size["fileIdentifyingUrlPathSegment"]
-
-            result = requests.get(url)
-            if result.ok:
-                company.logo.save(
-                    company.universal_name + ".png",
-                    ContentFile(result.content),
-                    save=False,
-                )
-                company.save()
+    # accounts are only picked here, their queues serialize the actual work
+    accounts = cycle(LinkedinAccount.objects.pick_least_used(count=len(task_args)))
 
-    return company
+    queued = defaultdict(list)
+    for args in task_args:
+        account_pk = next(accounts).pk
+        queued[account_pk].append((task.name, [account_pk, *args]))
 
+    for account_pk, items in queued.items():
+        AccountQueue(account_pk).extend(items)
+        run_account_queue.delay(account_pk)
 
-@app.task(
-    base=Singleton,
-    unique_on=["account_pk"],
-    raise_on_duplicate=True,
-    name="job.search_jobs",
-    time_limit=6 * 60,
-    lock_expiry=6 * 60,
-)
+    return len(task_args)
+
+
+@app.task(name="job.search_jobs", time_limit=6 * 60)
 def search_jobs(account_pk: int, location_pk: int, job_title_pk: int):
     """
     Search jobs based on provided args
@@ -100,6 +330,9 @@ def search_jobs(account_pk: int, location_pk: int, job_title_pk: int):
         account_pk: LinkedinAccount primary-key
         location_pk: JobLocation primary-key
         job_title_pk: JobTitle primary-key
+
+    Returns:
+        dict: count of created and already existing jobs
     """
 
     account = LinkedinAccount.objects.get(pk=account_pk)
@@ -107,67 +340,66 @@ def search_jobs(account_pk: int, location_pk: int, job_title_pk: int):
     job_title = JobTitle.objects.get(pk=job_title_pk)
 
     job_title_ids = list(
-        set(
-            [job_title.linkedin_id]
-            + list(
-                job_title.get_children(recursive=True).values_list(
-                    "linkedin_id",
-                    flat=True,
-                )
-            )
-        )
+        {job_title.linkedin_id, *job_title.get_descendant_linkedin_ids()}
     )
 
-    client = account.client
-
-    jobs = []
-    limit, chunk, offset, retries = 200, 20, 0, 20
-
-    while True:
-        errors = 0
-
-        try:
-            new_jobs = client.search_jobs(
-                location_geo_id=location.linkedin_geo_id,
-                job_title=job_title_ids,
-                offset=offset,
-                listed_at=24 * 60 * 60,
-                limit=chunk,
-            )
-        except requests.exceptions.JSONDecodeError:
-            if errors >= retries:
-                raise
-
-            errors += 1
-            default_evade()
-            continue
-
-        jobs.extend(new_jobs)
-        offset += chunk
+    history = SearchHistory(location.pk, job_title.pk)
+
+    # pages are saved as they arrive, a retried search resumes after the last one
+    checkpoint = Checkpoint(search_jobs.name, location_pk, job_title_pk)
+    progress = checkpoint.get() or {
+        "plan": history.plan(),
+        "started_at": timezone.now().timestamp(),
+        "offset": 0,
+        "fetched": 0,
+        "created": 0,
+        "existing": 0,
+    }
+    plan = SearchPlan(*progress["plan"])
+
+    pages = iter_search_pages(
+        account,
+        location.linkedin_geo_id,
+        job_title_ids,
+        plan,
+        progress["offset"],
+    )
 
-        if any(
-            [
-                not new_jobs,
-                offset >= limit,
-                len(new_jobs) < chunk,
-            ]
-        ):
-            break
-        default_evade()
-
-    for _job in jobs:
-        job_id = _job["trackingUrn"].split(":")[-1]
-        title = _job["title"]
-        job, job_created = Job.objects.get_or_create(
-            linkedin_id=job_id,
-            defaults={
-                "title": title,
-                "status": JobStatus.PARTIALLY_PROCEEDED,
-                "location": location,
-            },
-        )
-        job.job_titles.add(job_title)
-        job.save()
+    pending = PendingJobs()
+    fetched_pages = 0
+    try:
+        for offset, new_jobs in pages:
+            fetched_pages += 1
+            with metrics.DB_WRITE_SECONDS.labels(task=search_jobs.name).time():
+                created, existing = save_search_results(new_jobs, location, job_title)
+            metrics.JOBS_CREATED.inc(len(created))
+
+            progress["offset"] = offset
+            progress["fetched"] += len(new_jobs)
+            progress["created"] += len(created)
+            progress["existing"] += existing
+            checkpoint.save(progress)
+
+            # new jobs are processed while the search goes on
+            pending.push(created)
+            if len(pending) >= settings.PROCESS_JOBS_BATCH_SIZE:
+                process_pending_jobs.delay()
+    except (SoftTimeLimitExceeded, TimeLimitError):
+        raise
+    except Exception:
+        # only an interrupted search resumes, a failed one starts over with a
+        # fresh plan instead of skipping the first pages of the next search
+        checkpoint.clear()
+        raise
+
+    if progress["created"]:
+        process_pending_jobs.delay()
+
+    metrics.SEARCH_PAGES.observe(fetched_pages)
+    history.record(plan, progress["fetched"], progress["started_at"])
+    checkpoint.clear()
+
+    return {"created": progress["created"], "existing": progress["existing"]}
 
 
 @app.task(
@@ -181,179 +413,230 @@ def run_search_jobs():
     Break the whole task in smaller parts, to parallel the data loading
     """
 
-    locations = JobLocation.objects.filter(is_active=True).all()
-    job_titles = JobTitle.objects.filter(is_active=True, parent__isnull=True).all()
+    locations = JobLocation.objects.filter(is_active=True).values_list("pk", flat=True)
+    job_titles = JobTitle.objects.filter(
+        is_active=True, parent__isnull=True
+    ).values_list("pk", flat=True)
 
-    pending_task_args = []
-    for location in locations:
-        for job_title in job_titles:
-            account = get_least_used_account()
-            args = (account.pk, location.pk, job_title.pk)
+    return dispatch_to_accounts(search_jobs, list(product(locations, job_titles)))
 
-            try:
-                search_jobs.delay(*args)
-            except DuplicateTaskError:
-                pending_task_args.append(args)
 
-    while pending_task_args:
-        for idx, args in enumerate(pending_task_args):
+@app.task(name="job.process_jobs", time_limit=3 * 60)
+def process_jobs(account_pk: int, job_pks: list[int]):
+    """
+    Full process provided jobs
+
+    Args:
+        account_pk: LinkedinAccount primary-key
+        job_pks: A list of Job primary-keys
+    """
+
+    account = LinkedinAccount.objects.get(pk=account_pk)
+
+    # a retried task resumes after the last processed job. Jobs queued twice,
+    # or reviewed meanwhile, are already processed and left alone
+    checkpoint = Checkpoint(process_jobs.name, sorted(job_pks))
+    jobs = list(
+        Job.objects.for_pipeline()
+        .filter(
+            pk__in=job_pks,
+            pk__gt=checkpoint.get(0),
+            status=JobStatus.PARTIALLY_PROCEEDED,
+        )
+        .order_by("pk")
+    )
+    if not jobs:
+        checkpoint.clear()
+        return
+
+    scorer = get_scorer()
+    companies = CompanyResolver()
+    counters = JobCounters()
+    duplicates = DuplicateIndex()
+    logos = {}
+
+    resolved_jobs = account.call("get_jobs_batch", [job.linkedin_id for job in jobs])
+    companies.prefetch(resolved_jobs.values())
+
+    for offset in range(0, len(jobs), PROCESS_JOBS_WRITE_CHUNK):
+        expired, deleted, updated, changed_fields = [], [], [], set()
+
+        for job in jobs[offset : offset + PROCESS_JOBS_WRITE_CHUNK]:
+            job_data = resolved_jobs[job.linkedin_id]
+            if (not job_data) or (job_data["jobState"] != "LISTED"):
+                counters.move_status(job.status, JobStatus.EXPIRED)
+                expired.append(job.pk)
+                continue
+
             try:
-                search_jobs.delay(*args)
-                pending_task_args.pop(idx)
-            except DuplicateTaskError:
-                pass
+                fields, logo_url = process_job(
+                    job, job_data, scorer, companies, counters, duplicates
+                )
+            except NotValidCompanyError:
+                deleted.append(job.pk)
+                continue
+
+            if fields:
+                updated.append(job)
+                changed_fields |= fields
+            if logo_url:
+                logos[job.company_id] = logo_url
+
+        # changes of a chunk are written at once, along with the checkpoint
+        with metrics.DB_WRITE_SECONDS.labels(task=process_jobs.name).time():
+            now = timezone.now()
+            Job.objects.filter(pk__in=expired).update(
+                status=JobStatus.EXPIRED, updated_at=now
+            )
 
-        sleep(5)
+            counters.remove_jobs(deleted)
+            Job.objects.filter(pk__in=deleted).delete()
+
+            # contents are addressed by hash, unchanged ones are neither changed
+            # fields nor stored again
+            Job.store_contents(updated)
+            for job in updated:
+                job.updated_at = now
+            Job.objects.bulk_update(updated, [*sorted(changed_fields), "updated_at"])
+
+            counters.flush()
+        metrics.JOBS_UPDATED.labels(task=process_jobs.name).inc(
+            len(expired) + len(updated)
+        )
+        checkpoint.save(jobs[offset : offset + PROCESS_JOBS_WRITE_CHUNK][-1].pk)
+
+    checkpoint.clear()
+
+    if logos:
+        fetch_company_logos.delay(list(logos.items()))
 
 
 @app.task(
-    base=Singleton,
-    unique_on=["account_pk"],
-    raise_on_duplicate=True,
-    name="job.process_jobs",
-    time_limit=3 * 60,
-    lock_expiry=3 * 60,
+    name="job.fetch_company_logos",
+    time_limit=5 * 60,
 )
-def process_jobs(account_pk: int, job_pks: list[int]):
+def fetch_company_logos(logos: list[tuple[int, str]]):
     """
-    Full process provided jobs
+    Download and store company logos
+
+    Args:
+        logos: (Company primary-key, logo url) pairs
+
+    Returns:
+        int: count of updated companies
+    """
+
+    return fetch_logos(logos)
+
+
+@app.task(name="job.list_jobs", time_limit=10 * 60)
+def list_jobs(account_pk: int, job_pks: list[int]):
+    """
+    Fetch skills of approved jobs and list them
 
     Args:
         account_pk: LinkedinAccount primary-key
         job_pks: A list of Job primary-keys
+
+    Returns:
+        int: count of listed jobs
     """
 
     account = LinkedinAccount.objects.get(pk=account_pk)
-    jobs = Job.objects.filter(pk__in=job_pks).all()
+    jobs = list(
+        Job.objects.filter(pk__in=job_pks, is_active=True, status=JobStatus.APPROVED)
+        .order_by("pk")
+        .values_list("pk", "linkedin_id")
+    )
 
-    client = account.client
+    # listed jobs leave the approved status, a retried task resumes with the rest
+    listed, chunk = 0, 10
+    for offset in range(0, len(jobs), chunk):
+        jobs_skills = {
+            job_pk: account.call("get_job_skills", linkedin_id)
+            for job_pk, linkedin_id in jobs[offset : offset + chunk]
+        }
 
-    retries = 20
-    errors = 0
-    resolved_jobs = {}
-    while True:
-        try:
-            resolved_jobs = client.get_jobs_batch(
-                jobs.values_list("linkedin_id", flat=True)
+        with metrics.DB_WRITE_SECONDS.labels(task=list_jobs.name).time():
+            save_job_skills(jobs_skills)
+
+            updated = Job.objects.filter(pk__in=jobs_skills).update(
+                status=JobStatus.LISTED,
+                updated_at=timezone.now(),
             )
-            break
-        except requests.exceptions.JSONDecodeError:
-            if errors >= retries:
-                raise
-            errors += 1
-            default_evade()
-            continue
-
-    for job in jobs:
-        job_data = resolved_jobs[job.linkedin_id]
-
-        if (not job_data) or (job_data["jobState"] != "LISTED"):
-            job.status = JobStatus.EXPIRED
-            job.save()
-            continue
-
-        try:
-            job.company = resolve_company(job_data)
-        except (NotValidCompanyError, AttributeError, KeyError):
-            job.delete()
-            continue
-
-        job.description = job_data["description"]["text"]
-        job.attributes = job_data["description"]["attributesV2"]
-        job.full_location = job_data["location"]["defaultLocalizedName"]
-        job.listed_at = job_data["createdAt"]
-
-        for workplace_type in job_data.get("*jobWorkplaceTypes") or job_data.get(
-            "jobWorkplaceTypes", []
-        ):
-            workplace_type = workplace_type.split(":")[-1]
-            if workplace_type == "1":
-                job.on_site = True
-            if workplace_type == "2":
-                job.remote = True
-            if workplace_type == "3":
-                job.hybrid = True
-
-        # key in description: 1 point
-        # key in title: 2 points
-        # key+complement in description: 3 points
-        # key+title in description: 5 points
-        points = 0
-        description_contains_keywords, title_contains_keywords = False, False
-        _job_title, _job_description = job.title.lower(), job.description.lower()
-
-        for key in settings.LINKEDIN_JOB_DESCRIPTION_KEYWORDS:
-            key = key.lower()
-
-            if key in _job_description:
-                description_contains_keywords = True
-                points += 1
-
-            if key in _job_title:
-                title_contains_keywords = True
-                points += 2
-
-        for key_complement in settings.LINKEDIN_JOB_DESCRIPTION_KEYWORD_COMPLEMENTS:
-            key_complement = key_complement.lower()
-
-            if description_contains_keywords and (key_complement in _job_description):
-                points += 3
-
-            if title_contains_keywords and (key_complement in _job_title):
-                points += 5
-
-        job.points = points
-
-        if points > 0:
-            job.status = JobStatus.WAITING_FOR_REVIEW
-        else:
-            job.status = JobStatus.REJECTED
-
-        job.save()
+
+            counters = JobCounters()
+            counters.move_status(JobStatus.APPROVED, JobStatus.LISTED, updated)
+            counters.flush()
+        metrics.JOBS_UPDATED.labels(task=list_jobs.name).inc(updated)
+        listed += updated
+
+    return listed
+
+
+@app.task(
+    base=Singleton,
+    name="job.reconcile_job_counters",
+    lock_expiry=30 * 60,
+)
+def reconcile_job_counters():
+    """
+    Correct drifted job counters, run periodically
+
+    Returns:
+        int: count of corrected counters
+    """
+
+    return recount_jobs()
 
 
 @app.task(
     base=Singleton,
     name="job.list_approved_jobs",
-    time_limit=10 * 60,
     lock_expiry=10 * 60,
 )
 def list_approved_jobs():
-    account = get_least_used_account()
-    client = account.client
+    """
+    Run list jobs tasks.
+    Break approved jobs in smaller parts, and spread them over accounts
+    """
 
-    jobs = Job.objects.filter(is_active=True, status=JobStatus.APPROVED)
+    jobs = (
+        Job.objects.filter(is_active=True, status=JobStatus.APPROVED)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
 
-    for job in jobs:
+    chunk = 50
+    return dispatch_to_accounts(
+        list_jobs,
+        [
+            (list(jobs[offset : offset + chunk]),)
+            for offset in range(0, len(jobs), chunk)
+        ],
+    )
 
-        errors = 0
-        retries = 20
-        while True:
-            try:
-                job_skills = client.get_job_skills(job.linkedin_id)
-                break
-            except requests.exceptions.JSONDecodeError:
-                if errors >= retries:
-                    raise
 
-                errors += 1
-                default_evade()
-                continue
+@app.task(
+    base=Singleton,
+    name="job.process_pending_jobs",
+    lock_expiry=10 * 60,
+)
+def process_pending_jobs():
+    """
+    Drain the pending jobs queue, and spread its batches over accounts
 
-        # noinspection PyUnboundLocalVariable
-        for skill_data in job_skills.get("skillMatchStatuses", []):
-            skill = skill_data["skill"]
-            name = skill["name"]
-            linkedin_id = get_id_from_urn(skill["entityUrn"])
+    Returns:
+        int: count of dispatched process_jobs calls
+    """
 
-            skill_object, skill_created = JobSkill.objects.get_or_create(
-                linkedin_id=linkedin_id,
-                defaults={"name": name},
-            )
-            job.job_skills.add(skill_object)
+    pending = PendingJobs()
+
+    batches = []
+    while job_pks := pending.pop(settings.PROCESS_JOBS_BATCH_SIZE):
+        batches.append((job_pks,))
 
-        job.status = JobStatus.LISTED
-        job.save()
+    return dispatch_to_accounts(process_jobs, batches)
 
 
 @app.task(
@@ -363,36 +646,105 @@ def list_approved_jobs():
 )
 def run_process_jobs():
     """
-    Run process job tasks.
-    Break the whole task in smaller parts, to parallel the data loading
+    Reconciliation sweep: new jobs are processed through the pending jobs
+    queue, this puts back the ones which fell through it, e.g. when a search
+    was interrupted between saving and queueing them
+
+    Returns:
+        int: count of queued jobs
     """
 
     jobs = (
-        Job.objects.filter(is_active=True, status=JobStatus.PARTIALLY_PROCEEDED)
+        Job.objects.filter(
+            is_active=True,
+            status=JobStatus.PARTIALLY_PROCEEDED,
+            created_at__lt=timezone.now() - PENDING_JOBS_GRACE_PERIOD,
+        )
         .order_by("created_at")
         .values_list("pk", flat=True)
-        .distinct()
     )
 
-    chunk = 100
-    pending_task_args = []
-    for offset in range(0, len(jobs), chunk):
-        sliced_jobs = jobs[offset : offset + chunk]
+    pushed = PendingJobs().push(jobs.iterator(chunk_size=2000))
+    if pushed:
+        process_pending_jobs.delay()
 
-        account = get_least_used_account()
-        args = (account.pk, sliced_jobs)
+    return pushed
 
-        try:
-            process_jobs.delay(*args)
-        except DuplicateTaskError:
-            pending_task_args.append(args)
 
-    while pending_task_args:
-        for idx, args in enumerate(pending_task_args):
+@app.task(
+    base=Singleton,
+    unique_on=["account_pk"],
+    name="job.run_account_queue",
+    soft_time_limit=55 * 60,
+    time_limit=60 * 60,
+    lock_expiry=60 * 60,
+)
+def run_account_queue(account_pk: int):
+    """
+    Run queued tasks of an account one by one, until its queue is empty or the
+    time budget is spent. Leftovers, and items pushed while a finishing run
+    still holds the lock, are picked by the periodic `run_account_queues`.
+    A failing task is dropped, a task running out of its own time limit is put
+    back to resume from its checkpoint, until it ran out of it
+    `ACCOUNT_QUEUE_MAX_TIMEOUTS` times.
+
+    Args:
+        account_pk: LinkedinAccount primary-key
+    """
+
+    queue = AccountQueue(account_pk)
+    deadline = monotonic() + ACCOUNT_QUEUE_TIME_BUDGET
+
+    # put back the task an interrupted run didn't finish
+    queue.requeue_unfinished()
+
+    try:
+        while monotonic() < deadline:
+            item = queue.pop()
+            # a dispatcher pushing items while this run still holds its lock
+            # doesn't start another run, check again for them before leaving
+            if item is None and not len(queue):
+                break
+            if item is None:
+                continue
+
+            task_name, args, timeouts = item
+            task = app.tasks[task_name]
             try:
-                process_jobs.delay(*args)
-                pending_task_args.pop(idx)
-            except DuplicateTaskError:
-                pass
+                # queued tasks run inline, a hung one must not block the queue
+                with time_limit(task.time_limit):
+                    task(*args)
+            except SoftTimeLimitExceeded:
+                raise
+            except TimeLimitError:
+                if timeouts + 1 < ACCOUNT_QUEUE_MAX_TIMEOUTS:
+                    logger.warning(
+                        f"Queued task {task_name}{tuple(args)} timed out, " f"put back"
+                    )
+                    queue.push_front(task_name, args, timeouts + 1)
+                else:
+                    logger.exception(
+                        f"Queued task {task_name}{tuple(args)} timed out "
+                        f"{timeouts + 1} times, dropped"
+                    )
+            except Exception:  # noqa
+                logger.exception(f"Queued task {task_name}{tuple(args)} failed")
+
+            queue.done()
+    except SoftTimeLimitExceeded:
+        # the task resumes from its checkpoint on the next run
+        queue.requeue_unfinished()
+
+
+@app.task(
+    base=Singleton,
+    name="job.run_account_queues",
+    lock_expiry=5 * 60,
+)
+def run_account_queues():
+    """
+    Start draining every account queue which has queued tasks, run periodically
+    """
 
-        sleep(5)
+    for account_pk in AccountQueue.queued_accounts():
+        run_account_queue.delay(account_pk)
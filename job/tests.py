@@ -1,9 +1,51 @@
-from unittest.mock import MagicMock
+from datetime import timedelta
+from functools import partial
+from tempfile import TemporaryDirectory
+from time import sleep
+from unittest.mock import MagicMock, patch
 
-from django.test import TestCase
+from celery.exceptions import SoftTimeLimitExceeded
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.contrib.admin import site
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from job.models import JobTitle, Job, JobLocation
+from core.checkpoints import Checkpoint
+from core.exceptions import NotValidCompanyError
+from job import JobStatus
+from job.admin import CompanyAdmin, JobAdmin, JobStatusCountAdmin
+from job.companies import CompanyResolver
+from job.counters import JobCounters, recount_jobs
+from job.dedup import DuplicateIndex, get_signature, get_similarity
+from job.logos import fetch_logos, get_logo_url, logo_changed, store_logo
+from job.models import (
+    JobTitle,
+    Job,
+    JobLocation,
+    Company,
+    JobTitleClosure,
+    JobSkill,
+    JobStatusCount,
+    JobDescription,
+    JobAttributes,
+)
+from job.scoring import RelocationScorer, Score
+from job.search import SearchHistory, SearchPlan
+from job.tasks import (
+    ACCOUNT_QUEUE_MAX_TIMEOUTS,
+    dispatch_to_accounts,
+    list_jobs,
+    process_jobs,
+    process_pending_jobs,
+    run_account_queue,
+    run_process_jobs,
+    save_search_results,
+    search_jobs,
+)
+from linkedin.models import LinkedinAccount
 
 
 class JobTitleModelTest(TestCase):
@@ -132,6 +174,110 @@ class JobTitleModelTest(TestCase):
         self.assertIsNone(job_title.other_names)
 
 
+class JobTitleTreeTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.root = JobTitle.objects.create(title="Root", linkedin_id="1")
+        self.child = JobTitle.objects.create(
+            title="Child", linkedin_id="2", parent=self.root
+        )
+        self.grandchild = JobTitle.objects.create(
+            title="Grandchild", linkedin_id="3", parent=self.child
+        )
+        self.other_root = JobTitle.objects.create(title="Other Root", linkedin_id="4")
+
+    def test_descendants_in_one_query(self):
+        with self.assertNumQueries(1):
+            descendants = set(self.root.get_children(recursive=True))
+
+        self.assertEqual(descendants, {self.child, self.grandchild})
+
+    def test_ancestors(self):
+        self.assertEqual(
+            list(self.grandchild.get_ancestors()),
+            [self.child, self.root],
+        )
+
+    def test_move_subtree(self):
+        self.child.parent = self.other_root
+        self.child.save()
+
+        self.assertFalse(self.root.get_children(recursive=True).exists())
+        self.assertEqual(
+            set(self.other_root.get_children(recursive=True)),
+            {self.child, self.grandchild},
+        )
+        self.assertEqual(
+            JobTitleClosure.objects.get(
+                ancestor=self.other_root, descendant=self.grandchild
+            ).depth,
+            2,
+        )
+
+    def test_move_under_descendant(self):
+        self.root.parent = self.grandchild
+
+        with self.assertRaises(ValueError):
+            self.root.save()
+
+        self.assertEqual(set(self.grandchild.get_ancestors()), {self.child, self.root})
+
+    def test_clean_rejects_cycles(self):
+        for parent in [self.root, self.grandchild]:
+            self.root.parent = parent
+            with self.assertRaises(ValidationError) as context:
+                self.root.clean()
+
+            self.assertIn("parent", context.exception.message_dict)
+
+        self.grandchild.parent = self.other_root
+        self.grandchild.clean()
+
+    def test_deferred_parent(self):
+        with self.assertNumQueries(1):
+            job_title = JobTitle.objects.only("title").get(pk=self.grandchild.pk)
+
+        # saving loaded fields leaves the tree alone
+        job_title.title = "Renamed"
+        with CaptureQueriesContext(connection) as queries:
+            job_title.save()
+
+        self.assertFalse(
+            [
+                query
+                for query in queries.captured_queries
+                if "jobtitleclosure" in query["sql"]
+                and not query["sql"].startswith("SELECT")
+            ]
+        )
+
+        job_title.parent = self.other_root
+        job_title.save()
+
+        self.assertEqual(list(self.grandchild.get_ancestors()), [self.other_root])
+
+    def test_delete(self):
+        self.child.delete()
+        self.grandchild.refresh_from_db()
+
+        self.assertIsNone(self.grandchild.parent)
+        self.assertFalse(self.root.get_children(recursive=True).exists())
+        self.assertFalse(self.grandchild.get_ancestors().exists())
+
+    def test_cached_descendant_linkedin_ids(self):
+        self.assertEqual(set(self.root.get_descendant_linkedin_ids()), {"2", "3"})
+
+        with self.assertNumQueries(0):
+            self.root.get_descendant_linkedin_ids()
+
+        JobTitle.objects.create(title="New", linkedin_id="5", parent=self.grandchild)
+        self.assertEqual(set(self.root.get_descendant_linkedin_ids()), {"2", "3", "5"})
+
+        self.grandchild.delete()
+        self.assertEqual(self.root.get_descendant_linkedin_ids(), ["2"])
+
+
 class JobModelTest(TestCase):
 
     def setUp(self):
@@ -181,3 +327,1101 @@ class JobModelTest(TestCase):
         self.job.save()
 
         self.assertEqual(self.job.listed_at, datetime)
+
+    def test_contents_are_deduplicated(self):
+        self.job.description = "Relocation package"
+        self.job.attributes = [{"name": "visa"}]
+        self.job.save()
+
+        repost = Job.objects.create(
+            title="TEST JOB",
+            linkedin_id="4321",
+            location=self.location,
+            description="Relocation package",
+            attributes=[{"name": "visa"}],
+        )
+
+        self.assertEqual(JobDescription.objects.count(), 1)
+        self.assertEqual(JobAttributes.objects.count(), 1)
+        self.assertEqual(repost.description_content_id, self.job.description_content_id)
+
+        repost = Job.objects.get(pk=repost.pk)
+        self.assertEqual(repost.description, "Relocation package")
+        self.assertEqual(repost.attributes, [{"name": "visa"}])
+
+        # stored contents are not written again
+        with self.assertNumQueries(1):
+            repost.save()
+
+    def test_status_change_is_counted(self):
+        job = Job.objects.light().get(pk=self.job.pk)
+        job.status = JobStatus.APPROVED
+        job.save()
+        # saved again without a change
+        job.save()
+        # deferred status is not counted
+        Job.objects.only("pk").get(pk=self.job.pk).save(update_fields=["title"])
+
+        self.assertEqual(
+            dict(JobStatusCount.objects.values_list("status", "count")),
+            {JobStatus.PARTIALLY_PROCEEDED: -1, JobStatus.APPROVED: 1},
+        )
+
+    def test_empty_contents(self):
+        self.assertIsNone(self.job.description)
+        self.assertEqual(self.job.attributes, {})
+
+    def test_slim_querysets(self):
+        self.assertEqual(
+            Job.objects.light().get(pk=self.job.pk).get_deferred_fields(),
+            {"metadata"},
+        )
+        self.assertEqual(
+            Job.objects.for_pipeline().get(pk=self.job.pk).get_deferred_fields(),
+            {
+                "metadata",
+                "is_active",
+                "created_at",
+                "updated_at",
+                "full_time",
+                "part_time",
+                "contract",
+            },
+        )
+
+
+class JobSearchTest(TestCase):
+
+    def setUp(self):
+        location = JobLocation.objects.create(
+            title="TEST LOCATION",
+            iso_code="TS",
+            linkedin_geo_id="1234",
+            flag_emoji=":TS:",
+        )
+        company = Company.objects.create(
+            name="Relocating Co", universal_name="relocating", linkedin_id="1"
+        )
+        self.jobs = [
+            Job.objects.create(
+                title=title,
+                description=description,
+                linkedin_id=str(i),
+                location=location,
+                company=company if i == 2 else None,
+            )
+            for i, (title, description) in enumerate(
+                [
+                    ("Python Developer", "Visa sponsorship and relocation"),
+                    ("Go Developer", "Relocation package"),
+                    ("Designer", None),
+                ]
+            )
+        ]
+
+    def test_search(self):
+        self.assertEqual(
+            list(Job.objects.search("developer RELOCATION").order_by("pk")),
+            self.jobs[:2],
+        )
+        self.assertEqual(list(Job.objects.search("python visa")), self.jobs[:1])
+        self.assertFalse(Job.objects.search("python go").exists())
+        self.assertFalse(Job.objects.search("  ").exists())
+
+    @patch("job.models.connections")
+    def test_search_on_mysql(self, connections_mock):
+        connections_mock.__getitem__.return_value.vendor = "mysql"
+
+        where = Job.objects.search("python berlin").query.where
+
+        # one clause per word, matching the title or the description
+        self.assertEqual(where.connector, "AND")
+        self.assertEqual(len(where.children), 2)
+        for clause, term in zip(where.children, ["+python*", "+berlin*"]):
+            title, description = clause.children
+            self.assertEqual(clause.connector, "OR")
+            self.assertEqual((title.lhs.target.name, title.rhs), ("title", term))
+            [text] = description.rhs.where.children
+            self.assertEqual((text.lhs.target.name, text.rhs), ("text", term))
+
+        self.assertFalse(Job.objects.search("+-").exists())
+
+    def test_admin_search(self):
+        request = RequestFactory().get("/")
+        admin = JobAdmin(Job, site)
+
+        results, _ = admin.get_search_results(request, Job.objects.all(), "relocating")
+        self.assertEqual(list(results), self.jobs[2:])
+
+        results, _ = admin.get_search_results(request, Job.objects.all(), "visa")
+        self.assertEqual(list(results), self.jobs[:1])
+
+
+class JobsCountAdminTest(TestCase):
+
+    def setUp(self):
+        location = JobLocation.objects.create(
+            title="TEST LOCATION",
+            iso_code="TS",
+            linkedin_geo_id="1234",
+            flag_emoji=":TS:",
+        )
+        self.companies = [
+            Company.objects.create(
+                name=f"Company {i}", universal_name=f"company-{i}", linkedin_id=str(i)
+            )
+            for i in range(3)
+        ]
+        for i, company in enumerate(self.companies):
+            for j in range(i):
+                Job.objects.create(
+                    title="TEST JOB",
+                    linkedin_id=f"{i}-{j}",
+                    location=location,
+                    company=company,
+                )
+
+        # jobs created outside the pipeline are counted by the reconcile task
+        recount_jobs()
+
+    def test_jobs_count(self):
+        admin = CompanyAdmin(Company, site)
+        queryset = admin.get_queryset(RequestFactory().get("/"))
+
+        with self.assertNumQueries(1):
+            counts = [
+                (company, admin.jobs_count(company))
+                for company in queryset.order_by("-jobs_count")
+            ]
+
+        self.assertEqual(
+            counts, [(company, i) for i, company in enumerate(self.companies)][::-1]
+        )
+
+
+class SaveSearchResultsTest(TestCase):
+
+    def setUp(self):
+        self.location = JobLocation.objects.create(
+            title="TEST LOCATION",
+            iso_code="TS",
+            linkedin_geo_id="1234",
+            flag_emoji=":TS:",
+        )
+        self.job_title = JobTitle.objects.create(title="TEST TITLE", linkedin_id="1")
+
+    @staticmethod
+    def _search_result(job_id):
+        return {
+            "trackingUrn": f"urn:li:jobPosting:{job_id}",
+            "title": f"TEST JOB {job_id}",
+        }
+
+    def test_creates_new_jobs(self):
+        created, existing = save_search_results(
+            [self._search_result("1"), self._search_result("2")],
+            self.location,
+            self.job_title,
+        )
+
+        self.assertEqual((len(created), existing), (2, 0))
+        self.assertEqual(
+            set(self.job_title.jobs.values_list("linkedin_id", flat=True)),
+            {"1", "2"},
+        )
+        self.assertEqual(Job.objects.get(linkedin_id="1").title, "TEST JOB 1")
+
+    def test_counts_existing_jobs(self):
+        Job.objects.create(
+            title="TEST JOB",
+            linkedin_id="1",
+            location=self.location,
+            status=JobStatus.APPROVED,
+        )
+
+        created, existing = save_search_results(
+            [self._search_result("1"), self._search_result("2")],
+            self.location,
+            self.job_title,
+        )
+
+        self.assertEqual(created, [Job.objects.get(linkedin_id="2").pk])
+        self.assertEqual(existing, 1)
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertEqual(Job.objects.get(linkedin_id="1").status, JobStatus.APPROVED)
+        self.assertEqual(self.job_title.jobs.count(), 2)
+
+    def test_duplicate_results(self):
+        created, existing = save_search_results(
+            [self._search_result("1"), self._search_result("1")],
+            self.location,
+            self.job_title,
+        )
+
+        self.assertEqual((len(created), existing), (1, 0))
+
+        created, existing = save_search_results(
+            [self._search_result("1")],
+            self.location,
+            self.job_title,
+        )
+
+        self.assertEqual((created, existing), ([], 1))
+        self.assertEqual(self.job_title.jobs.count(), 1)
+
+    def test_updates_counters(self):
+        save_search_results(
+            [self._search_result("1"), self._search_result("2")],
+            self.location,
+            self.job_title,
+        )
+        save_search_results(
+            [self._search_result("2"), self._search_result("3")],
+            self.location,
+            self.job_title,
+        )
+
+        self.location.refresh_from_db()
+        self.job_title.refresh_from_db()
+        self.assertEqual(self.location.jobs_count, 3)
+        self.assertEqual(self.job_title.jobs_count, 3)
+        self.assertEqual(
+            JobStatusCount.objects.get(status=JobStatus.PARTIALLY_PROCEEDED).count, 3
+        )
+
+    def test_empty_results(self):
+        self.assertEqual(
+            save_search_results([], self.location, self.job_title), ([], 0)
+        )
+
+
+class RelocationScorerTest(TestCase):
+
+    keywords = ["relocation", "relo", "relocate", "visa"]
+    complements = ["package", "support", "sponsorship", "cover", "coverage"]
+
+    def _legacy_score(self, title, description):
+        points = 0
+        description_contains_keywords, title_contains_keywords = False, False
+        title, description = title.lower(), description.lower()
+
+        for key in self.keywords:
+            if key in description:
+                description_contains_keywords = True
+                points += 1
+            if key in title:
+                title_contains_keywords = True
+                points += 2
+
+        for complement in self.complements:
+            if description_contains_keywords and complement in description:
+                points += 3
+            if title_contains_keywords and complement in title:
+                points += 5
+
+        return points
+
+    def setUp(self):
+        self.scorer = RelocationScorer(self.keywords, self.complements)
+
+    def test_scores_match_legacy_scoring(self):
+        jobs = [
+            ("Backend Developer", "We offer a Relocation package."),
+            ("Backend Developer (Relocation)", "Visa sponsorship and support"),
+            ("Backend Developer", "relocate? no. Coverage of costs."),
+            ("Relo Support Engineer", "nothing here"),
+            ("Developer", ""),
+            ("Developer", "Relocating to Berlin with full coverage"),
+            ("Visa Relocation Package", "visa relocation package cover"),
+        ]
+
+        for (title, description), score in zip(jobs, self.scorer.score_many(jobs)):
+            self.assertEqual(score.points, self._legacy_score(title, description))
+
+    def test_matched_terms(self):
+        score = self.scorer.score("Developer", "Relocation package and coverage")
+
+        self.assertEqual(score.points, 2 + 3 * 3)
+        self.assertEqual(score.keywords, ["relocation", "relo"])
+        self.assertEqual(score.complements, ["package", "cover", "coverage"])
+
+    def test_complements_without_keywords(self):
+        score = self.scorer.score("Developer", "Health coverage and support")
+
+        self.assertEqual(score, Score(0, [], []))
+
+    def test_empty_terms(self):
+        scorer = RelocationScorer([], [])
+        self.assertEqual(scorer.score("Developer", "Relocation").points, 0)
+
+
+@patch("job.tasks.run_account_queue.delay")
+@patch("job.tasks.AccountQueue")
+class DispatchToAccountsTest(TestCase):
+
+    def setUp(self):
+        self.accounts = [
+            LinkedinAccount.objects.create(
+                username=f"user{i}", password="pass", last_used=timezone.now()
+            )
+            for i in range(2)
+        ]
+
+    def test_spreads_calls_over_accounts(self, queue_mock, delay_mock):
+        count = dispatch_to_accounts(search_jobs, [(1, 1), (1, 2), (2, 1)])
+
+        self.assertEqual(count, 3)
+        self.assertEqual(delay_mock.call_count, 2)
+
+        queued = {
+            queue_call.args[0]: extend_call.args[0]
+            for queue_call, extend_call in zip(
+                queue_mock.call_args_list,
+                queue_mock.return_value.extend.call_args_list,
+            )
+        }
+
+        self.assertEqual(
+            sorted(len(items) for items in queued.values()),
+            [1, 2],
+        )
+        for account_pk, items in queued.items():
+            for task_name, args in items:
+                self.assertEqual(task_name, "job.search_jobs")
+                self.assertEqual(args[0], account_pk)
+
+    def test_skips_queued_calls(self, queue_mock, delay_mock):
+        queue_mock.queued_items.return_value = [
+            ("job.search_jobs", [self.accounts[0].pk, 1, 1]),
+            ("job.list_jobs", [self.accounts[0].pk, 1, 2]),
+        ]
+
+        self.assertEqual(dispatch_to_accounts(search_jobs, [(1, 1), (1, 2)]), 1)
+        queue_mock.return_value.extend.assert_called_once_with(
+            [("job.search_jobs", [self.accounts[0].pk, 1, 2])]
+        )
+
+        self.assertEqual(dispatch_to_accounts(search_jobs, [(1, 1)]), 0)
+
+    def test_nothing_to_dispatch(self, queue_mock, delay_mock):
+        self.assertEqual(dispatch_to_accounts(search_jobs, []), 0)
+        delay_mock.assert_not_called()
+
+
+@patch("job.tasks.AccountQueue")
+class RunAccountQueueTest(TestCase):
+
+    def test_runs_queued_tasks(self, queue_mock):
+        queue_mock.return_value.pop.side_effect = [
+            ("job.search_jobs", [1, 2, 3], 0),
+            ("job.search_jobs", [1, 2, 4], 0),
+            None,
+        ]
+
+        with patch("job.tasks.search_jobs.run") as run_mock:
+            run_mock.side_effect = [Exception, None]
+            run_account_queue(1)
+
+        queue_mock.assert_called_once_with(1)
+        self.assertEqual(run_mock.call_count, 2)
+        run_mock.assert_called_with(1, 2, 4)
+
+    def test_drains_items_pushed_while_finishing(self, queue_mock):
+        queue_mock.return_value.pop.side_effect = [
+            None,
+            ("job.search_jobs", [1, 2, 3], 0),
+            None,
+        ]
+        queue_mock.return_value.__len__.side_effect = [1, 0]
+
+        with patch("job.tasks.search_jobs.run") as run_mock:
+            run_account_queue(1)
+
+        run_mock.assert_called_once_with(1, 2, 3)
+
+    @patch.object(search_jobs, "time_limit", 0.05)
+    def test_interrupts_hung_tasks(self, queue_mock):
+        queue_mock.return_value.pop.side_effect = [
+            ("job.search_jobs", [1, 2, 3], 0),
+            ("job.search_jobs", [1, 2, 4], 0),
+            None,
+        ]
+
+        with patch("job.tasks.search_jobs.run") as run_mock:
+            # the first task hangs
+            run_mock.side_effect = lambda *args: sleep(5) if args[2] == 3 else None
+            with self.assertLogs("job.tasks", "WARNING"):
+                run_account_queue(1)
+
+        self.assertEqual(run_mock.call_count, 2)
+        self.assertEqual(queue_mock.return_value.done.call_count, 2)
+        # the hung task is put back, to resume from its checkpoint
+        queue_mock.return_value.push_front.assert_called_once_with(
+            "job.search_jobs", [1, 2, 3], 1
+        )
+
+    @patch.object(search_jobs, "time_limit", 0.05)
+    def test_drops_tasks_timing_out_repeatedly(self, queue_mock):
+        queue_mock.return_value.pop.side_effect = [
+            ("job.search_jobs", [1, 2, 3], ACCOUNT_QUEUE_MAX_TIMEOUTS - 1),
+            None,
+        ]
+
+        with patch("job.tasks.search_jobs.run") as run_mock:
+            run_mock.side_effect = lambda *args: sleep(5)
+            with self.assertLogs("job.tasks", "ERROR"):
+                run_account_queue(1)
+
+        queue_mock.return_value.push_front.assert_not_called()
+        queue_mock.return_value.done.assert_called_once()
+
+
+class SearchHistoryTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_plan_without_history(self):
+        self.assertEqual(
+            SearchHistory(1, 1).plan(),
+            SearchPlan(chunk=20, limit=200, listed_at=24 * 60 * 60),
+        )
+
+    def test_plan_follows_recent_yields(self):
+        now = timezone.now().timestamp()
+        history = SearchHistory(1, 1)
+        plan = history.plan()
+        history.record(plan, 3, now)
+        history.record(plan, 5, now)
+
+        self.assertEqual(SearchHistory(1, 1).plan()[:2], (10, 10))
+
+        history.record(plan, 40, now)
+        self.assertEqual(SearchHistory(1, 1).plan()[:2], (20, 40))
+
+    def test_plan_grows_after_saturated_runs(self):
+        now = timezone.now().timestamp()
+        history = SearchHistory(1, 1)
+        history.record(SearchPlan(10, 10, 60 * 60), 3, now - 2 * 60 * 60)
+
+        # a surge fills the limit, the next runs fetch more of the same window
+        for limit in [10, 20, 40, 80, 160, 200]:
+            plan = SearchHistory(1, 1).plan()
+            self.assertEqual(plan.limit, limit)
+            self.assertAlmostEqual(plan.listed_at, 3 * 60 * 60, delta=5)
+            history.record(plan, plan.limit, now)
+
+        self.assertEqual(SearchHistory(1, 1).plan().limit, 200)
+
+        # until a run gets all the results
+        history.record(plan, 150, now)
+        plan = SearchHistory(1, 1).plan()
+        self.assertEqual(plan.limit, 200)
+        self.assertAlmostEqual(plan.listed_at, 60 * 60, delta=5)
+
+    def test_plan_from_high_water_mark(self):
+        now = timezone.now().timestamp()
+        history = SearchHistory(1, 1)
+        history.record(history.plan(), 1, now - 2 * 60 * 60)
+
+        listed_at = SearchHistory(1, 1).plan().listed_at
+        self.assertAlmostEqual(listed_at, 3 * 60 * 60, delta=5)
+        self.assertEqual(SearchHistory(1, 2).plan().listed_at, 24 * 60 * 60)
+
+
+class SearchJobsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.location = JobLocation.objects.create(
+            title="TEST LOCATION",
+            iso_code="TS",
+            linkedin_geo_id="1234",
+            flag_emoji=":TS:",
+        )
+        self.job_title = JobTitle.objects.create(title="TEST TITLE", linkedin_id="1")
+        self.account = LinkedinAccount.objects.create(
+            username="user", password="pass", last_used=timezone.now()
+        )
+
+    @staticmethod
+    def _page(*job_ids):
+        return [
+            {"trackingUrn": f"urn:li:jobPosting:{i}", "title": f"TEST JOB {i}"}
+            for i in job_ids
+        ]
+
+    @override_settings(PROCESS_JOBS_BATCH_SIZE=30)
+    @patch("job.tasks.process_pending_jobs.delay")
+    @patch("job.tasks.PendingJobs")
+    @patch("linkedin.models.LinkedinAccount.call")
+    def test_queues_new_jobs_while_searching(self, call_mock, pending_mock, delay_mock):
+        call_mock.side_effect = [
+            self._page(*range(0, 20)),
+            self._page(*range(20, 40)),
+            self._page(*range(40, 45)),
+        ]
+        pending_mock.return_value.__len__.side_effect = [20, 40, 5]
+
+        result = search_jobs(self.account.pk, self.location.pk, self.job_title.pk)
+
+        self.assertEqual(result, {"created": 45, "existing": 0})
+        self.assertEqual(call_mock.call_count, 3)
+        self.assertEqual(
+            [len(c.args[0]) for c in pending_mock.return_value.push.call_args_list],
+            [20, 20, 5],
+        )
+        self.assertEqual(delay_mock.call_count, 2)
+
+    @patch("job.tasks.process_pending_jobs.delay")
+    @patch("job.tasks.PendingJobs")
+    @patch("linkedin.models.LinkedinAccount.call")
+    def test_fetches_past_known_pages(self, call_mock, pending_mock, delay_mock):
+        # results are ordered by relevance, new jobs can follow known ones
+        call_mock.side_effect = [
+            self._page(*range(0, 20)),
+            self._page(*range(0, 20)),
+            self._page(*range(20, 25)),
+        ]
+        pending_mock.return_value.__len__.return_value = 0
+
+        self.assertEqual(
+            search_jobs(self.account.pk, self.location.pk, self.job_title.pk),
+            {"created": 25, "existing": 20},
+        )
+        self.assertEqual(call_mock.call_count, 3)
+        delay_mock.assert_called_once()
+
+        history = SearchHistory(self.location.pk, self.job_title.pk)
+        self.assertEqual(history.yields, [45])
+        self.assertIsNotNone(history.high_water_mark)
+
+    @patch("job.tasks.process_pending_jobs.delay")
+    @patch("job.tasks.PendingJobs")
+    @patch("linkedin.models.LinkedinAccount.call")
+    def test_checkpoint_on_failure(self, call_mock, pending_mock, delay_mock):
+        checkpoint = Checkpoint(search_jobs.name, self.location.pk, self.job_title.pk)
+        pending_mock.return_value.__len__.return_value = 0
+
+        # an interrupted search resumes after the saved page
+        call_mock.side_effect = [self._page(*range(0, 20)), SoftTimeLimitExceeded]
+        with self.assertRaises(SoftTimeLimitExceeded):
+            search_jobs(self.account.pk, self.location.pk, self.job_title.pk)
+        self.assertEqual(checkpoint.get()["offset"], 20)
+
+        # a failed one starts over
+        call_mock.side_effect = ValueError
+        with self.assertRaises(ValueError):
+            search_jobs(self.account.pk, self.location.pk, self.job_title.pk)
+        self.assertIsNone(checkpoint.get())
+
+    @patch.object(search_jobs, "time_limit", 0.05)
+    @patch("job.tasks.AccountQueue")
+    @patch("job.tasks.process_pending_jobs.delay")
+    @patch("job.tasks.PendingJobs")
+    @patch("linkedin.models.LinkedinAccount.call")
+    def test_resumes_after_timeout(
+        self, call_mock, pending_mock, delay_mock, queue_mock
+    ):
+        checkpoint = Checkpoint(search_jobs.name, self.location.pk, self.job_title.pk)
+        pending_mock.return_value.__len__.return_value = 0
+        args = [self.account.pk, self.location.pk, self.job_title.pk]
+        queue_mock.return_value.pop.side_effect = [("job.search_jobs", args, 0), None]
+
+        # the search hangs on its second page
+        pages = iter([self._page(*range(0, 20))])
+        call_mock.side_effect = lambda *a, **kw: next(pages, None) or sleep(5)
+        with self.assertLogs("job.tasks", "WARNING"):
+            run_account_queue(self.account.pk)
+
+        queue_mock.return_value.push_front.assert_called_once_with(
+            "job.search_jobs", args, 1
+        )
+        self.assertEqual(checkpoint.get()["offset"], 20)
+
+
+@patch("job.tasks.PendingJobs")
+class PendingJobsTest(TestCase):
+
+    @patch("job.tasks.dispatch_to_accounts")
+    def test_process_pending_jobs(self, dispatch_mock, pending_mock):
+        pending_mock.return_value.pop.side_effect = [[1, 2], [3], []]
+
+        process_pending_jobs()
+
+        dispatch_mock.assert_called_once_with(process_jobs, [([1, 2],), ([3],)])
+
+    @patch("job.tasks.process_pending_jobs.delay")
+    def test_run_process_jobs_sweeps_stale_jobs(self, delay_mock, pending_mock):
+        location = JobLocation.objects.create(
+            title="TEST LOCATION",
+            iso_code="TS",
+            linkedin_geo_id="1234",
+            flag_emoji=":TS:",
+        )
+        stale, fresh, processed = [
+            Job.objects.create(
+                title="TEST JOB", linkedin_id=str(i), location=location, status=status
+            )
+            for i, status in enumerate(
+                [
+                    JobStatus.PARTIALLY_PROCEEDED,
+                    JobStatus.PARTIALLY_PROCEEDED,
+                    JobStatus.APPROVED,
+                ]
+            )
+        ]
+        Job.objects.exclude(pk=fresh.pk).update(
+            created_at=timezone.now() - timedelta(days=1)
+        )
+
+        pushed = []
+        pending_mock.return_value.push.side_effect = lambda job_pks: pushed.extend(
+            job_pks
+        ) or len(pushed)
+
+        self.assertEqual(run_process_jobs(), 1)
+        self.assertEqual(pushed, [stale.pk])
+        delay_mock.assert_called_once()
+
+
+class CompanyLogoTest(TestCase):
+
+    url = "https://media.licdn.com/dms/image/logo_400_400/0?e=1&v=beta&t=token"
+
+    def setUp(self):
+        self.media_root = TemporaryDirectory()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root.name)
+        self.settings_override.enable()
+
+        self.company = Company.objects.create(
+            name="Company", universal_name="company", linkedin_id="1"
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media_root.cleanup()
+
+    def test_get_logo_url(self):
+        company_data = {
+            "logoResolutionResult": {
+                "vectorImage": {
+                    "rootUrl": "https://media.licdn.com/dms/image/",
+                    "artifacts": [
+                        {"width": 400, "fileIdentifyingUrlPathSegment": "logo_400"},
+                        {"width": 100, "fileIdentifyingUrlPathSegment": "logo_100"},
+                    ],
+                }
+            }
+        }
+
+        self.assertEqual(
+            get_logo_url(company_data), "https://media.licdn.com/dms/image/logo_400"
+        )
+        self.assertIsNone(get_logo_url({"logoResolutionResult": None}))
+
+    def test_store_logo_by_content(self):
+        name = store_logo(b"logo")
+
+        self.assertEqual(store_logo(b"logo"), name)
+        self.assertNotEqual(store_logo(b"another logo"), name)
+
+    @patch("job.logos.download_logo", return_value=b"logo")
+    def test_fetch_logos(self, download_logo_mock):
+        self.assertTrue(logo_changed(self.company, self.url))
+
+        self.assertEqual(fetch_logos([(self.company.pk, self.url)]), 1)
+        download_logo_mock.assert_called_once_with(self.url)
+
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.logo.read(), b"logo")
+        self.assertFalse(logo_changed(self.company, self.url.replace("token", "2")))
+        self.assertTrue(logo_changed(self.company, self.url.replace("400", "200")))
+
+    @patch("job.logos.download_logo", return_value=None)
+    def test_fetch_logos_failed_download(self, download_logo_mock):
+        self.assertEqual(fetch_logos([(self.company.pk, self.url)]), 0)
+
+
+class CompanyResolverTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(
+            name="Existing", universal_name="existing", linkedin_id="1"
+        )
+
+    @staticmethod
+    def _job_data(company_id, universal_name="company"):
+        return {
+            "company": {
+                "entityUrn": f"urn:li:fs_normalized_company:{company_id}",
+                "name": f"Company {company_id}",
+                "universalName": universal_name,
+            }
+        }
+
+    def test_prefetch(self):
+        resolver = CompanyResolver()
+        jobs_data = [
+            self._job_data("1"),
+            self._job_data("2"),
+            self._job_data("2"),
+            self._job_data("3", universal_name=None),
+            {"company": None},
+            None,
+        ]
+
+        # cache lookups don't hit the db: find, insert missing, fetch inserted
+        with self.assertNumQueries(3):
+            resolver.prefetch(jobs_data)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.resolve(self._job_data("1")), self.company)
+            self.assertEqual(resolver.resolve(self._job_data("2")).name, "Company 2")
+
+        with self.assertRaises(NotValidCompanyError):
+            resolver.resolve(self._job_data("3", universal_name=None))
+
+        self.assertEqual(Company.objects.count(), 2)
+
+    def test_resolve_from_cache(self):
+        CompanyResolver().prefetch([self._job_data("1")])
+
+        with self.assertNumQueries(0):
+            company = CompanyResolver().resolve(self._job_data("1"))
+
+        self.assertEqual(company, self.company)
+
+    def test_save_invalidates_cache(self):
+        CompanyResolver().prefetch([self._job_data("1")])
+
+        self.company.name = "Renamed"
+        self.company.save()
+
+        self.assertEqual(CompanyResolver().resolve(self._job_data("1")).name, "Renamed")
+
+    def test_delete_invalidates_cache(self):
+        CompanyResolver().prefetch([self._job_data("1")])
+
+        Company.objects.filter(pk=self.company.pk).delete()
+
+        resolver = CompanyResolver()
+        resolver.prefetch([self._job_data("1")])
+        company = resolver.resolve(self._job_data("1"))
+        self.assertNotEqual(company.pk, self.company.pk)
+        self.assertTrue(Company.objects.filter(pk=company.pk).exists())
+
+
+class ListJobsTest(TestCase):
+
+    def setUp(self):
+        location = JobLocation.objects.create(
+            title="TEST LOCATION",
+            iso_code="TS",
+            linkedin_geo_id="1234",
+            flag_emoji=":TS:",
+        )
+        self.jobs = [
+            Job.objects.create(
+                title="TEST JOB",
+                linkedin_id=str(i),
+                location=location,
+                status=JobStatus.APPROVED,
+            )
+            for i in range(3)
+        ]
+        self.jobs[2].status = JobStatus.REJECTED
+        self.jobs[2].save()
+
+        JobSkill.objects.create(name="Python", linkedin_id="1")
+        self.account = LinkedinAccount.objects.create(
+            username="user", password="pass", last_used=timezone.now()
+        )
+
+    @staticmethod
+    def _job_skills(*skills):
+        return {
+            "skillMatchStatuses": [
+                {"skill": {"name": name, "entityUrn": f"urn:li:fsd_skill:{i}"}}
+                for i, name in skills
+            ]
+        }
+
+    @patch("linkedin.models.LinkedinAccount.call")
+    def test_list_jobs(self, call_mock):
+        call_mock.side_effect = [
+            self._job_skills((1, "Python"), (2, "Django")),
+            self._job_skills((2, "Django"), (3, "Celery")),
+        ]
+
+        listed = list_jobs(self.account.pk, [job.pk for job in self.jobs])
+
+        self.assertEqual(listed, 2)
+        self.assertEqual(call_mock.call_count, 2)
+        self.assertEqual(JobSkill.objects.count(), 3)
+        self.assertEqual(
+            set(self.jobs[0].job_skills.values_list("name", flat=True)),
+            {"Python", "Django"},
+        )
+        self.assertEqual(
+            set(self.jobs[1].job_skills.values_list("name", flat=True)),
+            {"Django", "Celery"},
+        )
+        self.assertEqual(
+            list(Job.objects.order_by("pk").values_list("status", flat=True)),
+            [JobStatus.LISTED, JobStatus.LISTED, JobStatus.REJECTED],
+        )
+        self.assertEqual(
+            dict(JobSkill.objects.values_list("name", "jobs_count")),
+            {"Python": 1, "Django": 2, "Celery": 1},
+        )
+        self.assertEqual(
+            dict(JobStatusCount.objects.values_list("status", "count")),
+            {JobStatus.APPROVED: -2, JobStatus.LISTED: 2},
+        )
+
+
+@patch("job.tasks.DuplicateIndex", partial(DuplicateIndex, persistent=False))
+class ProcessJobsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        location = JobLocation.objects.create(
+            title="TEST LOCATION",
+            iso_code="TS",
+            linkedin_geo_id="1234",
+            flag_emoji=":TS:",
+        )
+        self.jobs = [
+            Job.objects.create(title="TEST JOB", linkedin_id=str(i), location=location)
+            for i in range(3)
+        ]
+        self.account = LinkedinAccount.objects.create(
+            username="user", password="pass", last_used=timezone.now()
+        )
+
+    @staticmethod
+    def _job_data(company=True):
+        return {
+            "jobState": "LISTED",
+            "company": {
+                "entityUrn": "urn:li:fsd_company:10",
+                "name": "TEST COMPANY",
+                "universalName": "test-company" if company else None,
+            },
+            "description": {"text": "Relocation package", "attributesV2": []},
+            "location": {"defaultLocalizedName": "Berlin, Germany"},
+            "createdAt": 1618920000000,
+            "jobWorkplaceTypes": ["urn:li:fs_workplaceType:2"],
+        }
+
+    @patch("linkedin.models.LinkedinAccount.call")
+    def test_process_jobs(self, call_mock):
+        call_mock.return_value = {
+            "0": self._job_data(),
+            "1": None,
+            "2": self._job_data(company=False),
+        }
+
+        process_jobs(self.account.pk, [job.pk for job in self.jobs])
+
+        job = Job.objects.get(pk=self.jobs[0].pk)
+        self.assertEqual(job.company.linkedin_id, "10")
+        self.assertEqual(job.description, "Relocation package")
+        self.assertEqual(job.full_location, "Berlin, Germany")
+        self.assertEqual(job.listed_at.timestamp(), 1618920000)
+        self.assertTrue(job.remote)
+        self.assertEqual(job.status, JobStatus.WAITING_FOR_REVIEW)
+        self.assertEqual(job.company.jobs_count, 1)
+
+        self.assertEqual(Job.objects.get(pk=self.jobs[1].pk).status, JobStatus.EXPIRED)
+        self.assertFalse(Job.objects.filter(pk=self.jobs[2].pk).exists())
+
+    @patch("linkedin.models.LinkedinAccount.call")
+    def test_marks_duplicates(self, call_mock):
+        call_mock.return_value = {"0": self._job_data(), "1": self._job_data()}
+
+        process_jobs(self.account.pk, [self.jobs[0].pk, self.jobs[1].pk])
+
+        job, duplicate = Job.objects.filter(pk__in=[self.jobs[0].pk, self.jobs[1].pk])
+        self.assertEqual(job.status, JobStatus.WAITING_FOR_REVIEW)
+        self.assertIsNone(job.duplicate_of)
+        self.assertEqual(duplicate.status, JobStatus.DUPLICATE)
+        self.assertEqual(duplicate.duplicate_of, job)
+        self.assertEqual(
+            JobStatusCount.objects.get(status=JobStatus.DUPLICATE).count, 1
+        )
+
+    @patch("linkedin.models.LinkedinAccount.call")
+    def test_skips_processed_jobs(self, call_mock):
+        call_mock.return_value = {"0": self._job_data()}
+        process_jobs(self.account.pk, [self.jobs[0].pk])
+
+        # a reviewer approves the job before it's processed again
+        Job.objects.filter(pk=self.jobs[0].pk).update(status=JobStatus.APPROVED)
+        updated_at = Job.objects.get(pk=self.jobs[0].pk).updated_at
+        process_jobs(self.account.pk, [self.jobs[0].pk])
+
+        job = Job.objects.get(pk=self.jobs[0].pk)
+        self.assertEqual(job.status, JobStatus.APPROVED)
+        self.assertEqual(job.updated_at, updated_at)
+        self.assertEqual(call_mock.call_count, 1)
+        self.assertEqual(JobDescription.objects.count(), 1)
+
+    @patch("job.tasks.process_job", return_value=(set(), None))
+    @patch("linkedin.models.LinkedinAccount.call")
+    def test_resumes_after_checkpoint(self, call_mock, process_job_mock):
+        job_pks = [job.pk for job in self.jobs]
+        call_mock.return_value = {
+            job.linkedin_id: {"jobState": "LISTED"} for job in self.jobs
+        }
+        checkpoint = Checkpoint(process_jobs.name, sorted(job_pks))
+        checkpoint.save(self.jobs[0].pk)
+
+        with self.assertNumQueries(2):
+            process_jobs(self.account.pk, list(reversed(job_pks)))
+
+        self.assertEqual(
+            [c.args[0] for c in process_job_mock.call_args_list], self.jobs[1:]
+        )
+        self.assertIsNone(checkpoint.get())
+
+
+class JobCountersTest(TestCase):
+
+    def setUp(self):
+        self.location = JobLocation.objects.create(
+            title="TEST LOCATION",
+            iso_code="TS",
+            linkedin_geo_id="1234",
+            flag_emoji=":TS:",
+        )
+        self.job_title = JobTitle.objects.create(title="TEST TITLE", linkedin_id="1")
+        self.jobs = [
+            Job.objects.create(
+                title="TEST JOB",
+                linkedin_id=str(i),
+                location=self.location,
+                status=JobStatus.APPROVED,
+            )
+            for i in range(3)
+        ]
+        self.job_title.jobs.set(self.jobs)
+        recount_jobs()
+
+    def test_recount_jobs(self):
+        self.location.refresh_from_db()
+        self.job_title.refresh_from_db()
+        self.assertEqual(self.location.jobs_count, 3)
+        self.assertEqual(self.job_title.jobs_count, 3)
+        self.assertEqual(JobStatusCount.objects.get(status=JobStatus.APPROVED).count, 3)
+        self.assertEqual(JobStatusCount.objects.get(status=JobStatus.LISTED).count, 0)
+
+        JobLocation.objects.update(jobs_count=10)
+        self.assertEqual(recount_jobs(), 1)
+        self.assertEqual(recount_jobs(), 0)
+
+    def test_flush(self):
+        counters = JobCounters()
+        counters.remove_jobs([self.jobs[0].pk])
+        counters.move_status(JobStatus.APPROVED, JobStatus.LISTED, 2)
+        counters.add(JobLocation, self.location.pk, 5)
+        counters.add(JobTitle, None)
+
+        with self.assertNumQueries(5):
+            counters.flush()
+
+        self.location.refresh_from_db()
+        self.job_title.refresh_from_db()
+        self.assertEqual(self.location.jobs_count, 3 - 1 + 5)
+        self.assertEqual(self.job_title.jobs_count, 2)
+        self.assertEqual(
+            dict(JobStatusCount.objects.values_list("status", "count"))[
+                JobStatus.APPROVED
+            ],
+            0,
+        )
+
+        # nothing is left to flush
+        with self.assertNumQueries(0):
+            counters.flush()
+
+    def test_admin_is_read_only(self):
+        admin = JobStatusCountAdmin(JobStatusCount, site)
+        request = RequestFactory().get("/")
+        counter = JobStatusCount.objects.first()
+
+        self.assertFalse(admin.has_add_permission(request))
+        self.assertFalse(admin.has_change_permission(request, counter))
+        self.assertFalse(admin.has_delete_permission(request, counter))
+
+
+class DuplicateIndexTest(TestCase):
+
+    description = (
+        "We are looking for a senior backend engineer to join our platform team "
+        "in Berlin. You will design and build scalable services in Python and "
+        "Django, work closely with product and data teams, and mentor other "
+        "engineers. We offer a relocation package, visa sponsorship, a yearly "
+        "learning budget and thirty days of paid vacation."
+    )
+
+    def setUp(self):
+        location = JobLocation.objects.create(
+            title="TEST LOCATION",
+            iso_code="TS",
+            linkedin_geo_id="1234",
+            flag_emoji=":TS:",
+        )
+        self.jobs = [
+            Job.objects.create(title="TEST JOB", linkedin_id=str(i), location=location)
+            for i in range(3)
+        ]
+        self.index = DuplicateIndex(persistent=False)
+
+    def test_signature(self):
+        reposted = self.description.upper().replace("thirty", "30")
+        other = "Junior frontend developer, React and TypeScript, remote in Spain."
+
+        signature = get_signature(self.description)
+        self.assertEqual(signature, get_signature(self.description))
+        self.assertGreater(get_similarity(signature, get_signature(reposted)), 0.8)
+        self.assertLess(get_similarity(signature, get_signature(other)), 0.2)
+        self.assertIsNone(get_signature("  ...  "))
+
+    def test_match_or_add(self):
+        job, duplicate, other = self.jobs
+
+        self.assertIsNone(self.index.match_or_add(job.pk, self.description))
+        # a job is not a duplicate of itself when processed again
+        self.assertIsNone(self.index.match_or_add(job.pk, self.description))
+        self.assertEqual(
+            self.index.match_or_add(duplicate.pk, f"{self.description} Apply now!"),
+            job.pk,
+        )
+        self.assertIsNone(self.index.match_or_add(other.pk, "Unrelated job offer"))
+        self.assertIsNone(self.index.match_or_add(other.pk, None))
+
+    def test_drops_deleted_jobs(self):
+        job, duplicate, _ = self.jobs
+        self.index.match_or_add(job.pk, self.description)
+        # a later batch
+        self.index.added.clear()
+        job.delete()
+
+        self.assertIsNone(self.index.match_or_add(duplicate.pk, self.description))
+        self.assertNotIn(job.pk, self.index.signatures)
+
+    def test_replaces_retired_jobs(self):
+        job, repost, duplicate = self.jobs
+        self.index.match_or_add(job.pk, self.description)
+        self.index.added.clear()
+        Job.objects.filter(pk=job.pk).update(status=JobStatus.EXPIRED)
+
+        # a repost of an expired job goes to review, in place of the job
+        self.assertIsNone(self.index.match_or_add(repost.pk, self.description))
+        self.assertNotIn(job.pk, self.index.signatures)
+        self.assertEqual(
+            self.index.match_or_add(duplicate.pk, self.description), repost.pk
+        )
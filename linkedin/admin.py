@@ -1,7 +1,9 @@
 from django.contrib import admin
+from django.utils.translation import gettext_lazy as _
 
 from core.admin import BaseModelAdmin
 from linkedin.models import HTTPProxy, LinkedinAccount
+from linkedin.ratelimit import get_stats
 
 
 @admin.register(HTTPProxy)
@@ -15,3 +17,15 @@ class HTTPProxyAdmin(BaseModelAdmin):
 class LinkedinAccountAdmin(BaseModelAdmin):
     list_display = ["username", "is_active"]
     ordering = ["-is_active", "-id"]
+    readonly_fields = ["rate_limit_stats"]
+
+    @admin.display(description=_("rate limit stats"))
+    def rate_limit_stats(self, obj):
+        if not obj.pk:
+            return "-"
+
+        stats = get_stats(obj)
+        return (
+            f"{stats['calls']} calls, {stats['waits']} throttled, "
+            f"{stats['wait_seconds']:.1f}s waited"
+        )
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import NamedTuple
+
+from django.conf import settings
+from linkedin_api import Linkedin
+from requests.cookies import cookiejar_from_dict
+
+
+class PooledClient(NamedTuple):
+    fingerprint: tuple
+    client: Linkedin
+    last_used: float
+
+
+class LinkedinClientPool:
+    """
+    Per-process pool of authenticated Linkedin clients, keyed by account pk.
+
+    Clients keep their HTTP session (and its keep-alive connections) between
+    tasks, so an account logs in once per worker process instead of once per
+    task. Clients idle for more than `ttl` seconds are evicted, and the least
+    recently used client is evicted when the pool exceeds `max_size`.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clients: OrderedDict[int, PooledClient] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._clients)
+
+    @staticmethod
+    def fingerprint(account) -> tuple:
+        """
+        Account fields a client is built from, a client is rebuilt when they change
+        """
+
+        proxy = account.proxy.link if account.proxy else None
+        return account.username, account.password, proxy
+
+    def get(self, account) -> Linkedin:
+        """
+        Get a live client of account, build a new one if there's none
+
+        Args:
+            account: LinkedinAccount instance
+
+        Returns:
+            Linkedin: client of the account
+        """
+
+        fingerprint = self.fingerprint(account)
+        now = monotonic()
+
+        with self._lock:
+            self._evict_idle(now)
+
+            pooled = self._clients.pop(account.pk, None)
+            if pooled and pooled.fingerprint == fingerprint:
+                self._clients[account.pk] = pooled._replace(last_used=now)
+                return pooled.client
+
+        client = self.build(account)
+
+        with self._lock:
+            self._clients[account.pk] = PooledClient(fingerprint, client, now)
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+
+        return client
+
+    def discard(self, account_pk: int):
+        """
+        Drop the client of an account, e.g. after it failed
+
+        Args:
+            account_pk: LinkedinAccount primary-key
+        """
+
+        with self._lock:
+            self._clients.pop(account_pk, None)
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    @staticmethod
+    def build(account) -> Linkedin:
+        if proxy := account.proxy:
+            proxy = proxy.link_dict
+
+        if cookies := account.cookies:
+            cookies = cookiejar_from_dict(account.cookies)
+
+        return Linkedin(
+            account.username,
+            account.password,
+            proxies=proxy or {},
+            cookies=cookies,
+        )
+
+    def _evict_idle(self, now: float):
+        for account_pk, pooled in list(self._clients.items()):
+            if now - pooled.last_used > self.ttl:
+                del self._clients[account_pk]
+
+
+client_pool = LinkedinClientPool(
+    max_size=settings.LINKEDIN_CLIENT_POOL_SIZE,
+    ttl=settings.LINKEDIN_CLIENT_POOL_TTL,
+)
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.4 on 2026-10-18 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("linkedin", "0002_linkedinaccount_last_used"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="linkedinaccount",
+            name="leased_until",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="leased until"
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.4 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("linkedin", "0003_linkedinaccount_leased_until"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="httpproxy",
+            name="rate_limit",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="requests per minute, leave blank to use the default",
+                null=True,
+                verbose_name="rate limit",
+            ),
+        ),
+        migrations.AddField(
+            model_name="linkedinaccount",
+            name="rate_limit",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="requests per minute, leave blank to use the default",
+                null=True,
+                verbose_name="rate limit",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.4 on 2026-10-18 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("linkedin", "0004_rate_limit"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="linkedinaccount",
+            index=models.Index(
+                fields=["is_active", "last_used"], name="account_active_last_used_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.4 on 2026-10-18 15:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("linkedin", "0005_linkedinaccount_active_last_used_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="linkedinaccount",
+            name="leased_until",
+        ),
+    ]
@@ -1,9 +1,18 @@
+import random
+from time import sleep
+from typing import Optional
+
+import requests.exceptions
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from linkedin_api import Linkedin
-from requests.cookies import cookiejar_from_dict
 
+from core import metrics
+from core.exceptions import NoLinkedinAccountError
 from core.models import ModelWithMetadata
+from linkedin.clients import client_pool
+from linkedin.ratelimit import throttle
 
 
 class HTTPProxy(ModelWithMetadata):
@@ -15,6 +24,12 @@ class HTTPProxy(ModelWithMetadata):
     port = models.IntegerField(_("port"))
     username = models.CharField(_("username"), max_length=64, null=True, blank=True)
     password = models.CharField(_("password"), max_length=64, null=True, blank=True)
+    rate_limit = models.PositiveIntegerField(
+        _("rate limit"),
+        null=True,
+        blank=True,
+        help_text=_("requests per minute, leave blank to use the default"),
+    )
 
     def __str__(self):
         return self.link
@@ -30,10 +45,52 @@ class HTTPProxy(ModelWithMetadata):
         return {"http": self.link, "https": self.link}
 
 
+class LinkedinAccountQuerySet(models.QuerySet):
+
+    def pick_least_used(self, count: int = 1) -> list:
+        """
+        Pick the least used active accounts and mark them as used, with one
+        UPDATE. Accounts are not reserved: their work queues serialize the work
+        given to them, so concurrent callers may pick the same accounts.
+
+        Args:
+            count: maximum number of accounts to pick
+
+        Raises:
+            NoLinkedinAccountError: If there's no active LinkedinAccount
+
+        Returns:
+            list[LinkedinAccount]: picked accounts, least used first
+        """
+
+        accounts = list(
+            self.filter(is_active=True)
+            .select_related("proxy")
+            .order_by("last_used")[:count]
+        )
+        if not accounts:
+            raise NoLinkedinAccountError("No active LinkedinAccount available.")
+
+        now = timezone.now()
+        LinkedinAccount.objects.filter(
+            pk__in=[account.pk for account in accounts]
+        ).update(last_used=now)
+        for account in accounts:
+            account.last_used = now
+
+        return accounts
+
+
 class LinkedinAccount(ModelWithMetadata):
     class Meta:
         verbose_name = _("Linkedin Account")
         verbose_name_plural = _("Linkedin Accounts")
+        indexes = [
+            models.Index(
+                fields=["is_active", "last_used"],
+                name="account_active_last_used_idx",
+            ),
+        ]
 
     username = models.CharField(
         _("username"), max_length=128, unique=True, db_index=True
@@ -48,26 +105,94 @@ class LinkedinAccount(ModelWithMetadata):
         null=True,
         blank=True,
     )
+    rate_limit = models.PositiveIntegerField(
+        _("rate limit"),
+        null=True,
+        blank=True,
+        help_text=_("requests per minute, leave blank to use the default"),
+    )
+
+    objects = LinkedinAccountQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.username} #{self.pk}"
 
     @property
     def client(self):
-        if proxy := self.proxy:
-            proxy = proxy.link_dict
-
-        if cookies := self.cookies:
-            cookies = cookiejar_from_dict(self.cookies)
-
-        client = Linkedin(
-            self.username,
-            self.password,
-            proxies=proxy or {},
-            cookies=cookies,
-        )
-
-        self.cookies = dict(client._cookies())
-        self.save()
-
+        client = client_pool.get(self)
+        self.save_cookies(client)
         return client
+
+    def save_cookies(self, client):
+        """
+        Store client cookies, only if they've changed
+
+        Args:
+            client: Linkedin client of this account
+        """
+
+        cookies = dict(client._cookies())
+        if cookies == self.cookies:
+            return
+
+        self.cookies = cookies
+        LinkedinAccount.objects.filter(pk=self.pk).update(cookies=cookies)
+
+    def call(self, method: str, *args, retries: Optional[int] = None, **kwargs):
+        """
+        Call a client method, rate limited per account and proxy. Calls failed
+        with a JSONDecodeError are retried after an exponential backoff, with
+        jitter. The pooled client is dropped when
+        the call fails, it may be logged out or challenged.
+
+        Args:
+            method: Linkedin client method name
+            retries: maximum number of retries, defaults to LINKEDIN_RETRIES
+            *args: method args
+            **kwargs: method kwargs
+
+        Returns:
+            Any: method result
+        """
+
+        if retries is None:
+            retries = settings.LINKEDIN_RETRIES
+
+        client = self.client
+
+        errors = 0
+        while True:
+            with metrics.LINKEDIN_THROTTLE_SECONDS.labels(
+                account=self.pk, proxy=self.proxy_id or ""
+            ).time():
+                throttle(self)
+
+            try:
+                with metrics.linkedin_request(method, self):
+                    return getattr(client, method)(*args, **kwargs)
+            except requests.exceptions.JSONDecodeError:
+                if errors >= retries:
+                    self.reset_client()
+                    raise
+
+                errors += 1
+                metrics.LINKEDIN_REQUEST_RETRIES.labels(
+                    method=method, account=self.pk, proxy=self.proxy_id or ""
+                ).inc()
+
+                # back-to-back retries are what gets an account challenged
+                backoff = min(
+                    settings.LINKEDIN_RETRY_BACKOFF * 2 ** (errors - 1),
+                    settings.LINKEDIN_RETRY_BACKOFF_MAX,
+                )
+                sleep(backoff * random.uniform(0.5, 1))
+            except Exception:
+                self.reset_client()
+                raise
+
+    def reset_client(self):
+        """
+        Drop the pooled client of this account, next access builds a new one
+        """
+
+        client_pool.discard(self.pk)
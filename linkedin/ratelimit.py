@@ -0,0 +1,105 @@
+from time import sleep
+
+from django.conf import settings
+
+from core.redis import get_redis_connection
+
+# Reserves one token from a bucket refilled at `rate` tokens per second up to
+# `burst` tokens. Tokens can go negative, the caller waits until its reserved
+# token is refilled, so concurrent workers queue up instead of bursting.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate) - 1
+
+local wait = 0
+if tokens < 0 then
+    wait = -tokens / rate
+end
+
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil((burst - tokens) / rate) + 60)
+
+redis.call("HINCRBY", KEYS[2], "calls", 1)
+if wait > 0 then
+    redis.call("HINCRBY", KEYS[2], "waits", 1)
+    redis.call("HINCRBYFLOAT", KEYS[2], "wait_seconds", tostring(wait))
+end
+
+return tostring(wait)
+"""
+
+
+def get_bucket_key(obj) -> str:
+    return f"linkedin:ratelimit:{obj._meta.model_name}:{obj.pk}"
+
+
+def reserve(obj, rate: int) -> float:
+    """
+    Reserve a request from the token bucket of obj
+
+    Args:
+        obj: LinkedinAccount or HTTPProxy instance
+        rate: allowed requests per minute
+
+    Returns:
+        float: seconds to wait before making the request
+    """
+
+    key = get_bucket_key(obj)
+    script = get_redis_connection().register_script(TOKEN_BUCKET_SCRIPT)
+    wait = script(
+        keys=[key, f"{key}:stats"],
+        args=[rate / 60, settings.LINKEDIN_RATE_LIMIT_BURST],
+    )
+
+    return float(wait)
+
+
+def throttle(account) -> float:
+    """
+    Wait until account, and its proxy, are allowed to make another request
+
+    Args:
+        account: LinkedinAccount instance
+
+    Returns:
+        float: waited seconds
+    """
+
+    buckets = [(account, account.rate_limit or settings.LINKEDIN_RATE_LIMIT)]
+    if proxy := account.proxy:
+        buckets.append((proxy, proxy.rate_limit or settings.LINKEDIN_PROXY_RATE_LIMIT))
+
+    wait = max([reserve(obj, rate) for obj, rate in buckets if rate] or [0])
+    if wait > 0:
+        sleep(wait)
+
+    return wait
+
+
+def get_stats(obj) -> dict:
+    """
+    Get rate limit stats of obj
+
+    Args:
+        obj: LinkedinAccount or HTTPProxy instance
+
+    Returns:
+        dict: count of calls, count of calls that waited and total waited seconds
+    """
+
+    stats = get_redis_connection().hgetall(f"{get_bucket_key(obj)}:stats")
+
+    return {
+        "calls": int(stats.get(b"calls", 0)),
+        "waits": int(stats.get(b"waits", 0)),
+        "wait_seconds": float(stats.get(b"wait_seconds", 0)),
+    }
@@ -1,5 +1,7 @@
 import os
 
+from celery.schedules import crontab
+
 
 def env_literal(key, _default=None):
     value = os.environ.get(key, _default)
@@ -12,7 +14,19 @@ CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = CELERY_BROKER_URL
 CELERY_TIMEZONE = os.environ.get("TIME_ZONE")
 
-CELERY_BEAT_SCHEDULE = {}
+CELERY_BEAT_SCHEDULE = {
+    # account queues left with tasks by a run out of time budget, or filled
+    # while their run was finishing
+    "run-account-queues": {
+        "task": "job.run_account_queues",
+        "schedule": env_literal("RUN_ACCOUNT_QUEUES_INTERVAL", 5 * 60),
+    },
+    # denormalized job counters drifted by changes outside the pipeline
+    "reconcile-job-counters": {
+        "task": "job.reconcile_job_counters",
+        "schedule": crontab(minute=0, hour=4),
+    },
+}
 
 # commands to run!
 # celery -A celery_app multi start periodic celery -B -Q:1 periodic_queue -Q:2 celery -c:1 2 -c:2 5 -l INFO
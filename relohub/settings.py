@@ -111,6 +111,9 @@ CACHES = {
     }
 }
 
+# Tests run with an in-memory cache
+TEST_RUNNER = "core.tests.runner.TestRunner"
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -143,6 +146,34 @@ LINKEDIN_JOB_DESCRIPTION_KEYWORD_COMPLEMENTS = [
     "cover",
 ]
 
+# Linkedin clients are pooled per worker process
+LINKEDIN_CLIENT_POOL_SIZE = env_literal("LINKEDIN_CLIENT_POOL_SIZE", 16)
+LINKEDIN_CLIENT_POOL_TTL = env_literal("LINKEDIN_CLIENT_POOL_TTL", 30 * 60)
+
+# Default Linkedin requests per minute, per account and per proxy
+LINKEDIN_RATE_LIMIT = env_literal("LINKEDIN_RATE_LIMIT", 20)
+LINKEDIN_PROXY_RATE_LIMIT = env_literal("LINKEDIN_PROXY_RATE_LIMIT", 60)
+LINKEDIN_RATE_LIMIT_BURST = env_literal("LINKEDIN_RATE_LIMIT_BURST", 5)
+
+# Linkedin calls failed with a JSONDecodeError are retried this many times,
+# after a backoff doubling from this many seconds, up to the max. Retries of a
+# call sleep 50 seconds at most, well inside the 3 minutes of process_jobs
+LINKEDIN_RETRIES = env_literal("LINKEDIN_RETRIES", 5)
+LINKEDIN_RETRY_BACKOFF = env_literal("LINKEDIN_RETRY_BACKOFF", 2)
+LINKEDIN_RETRY_BACKOFF_MAX = env_literal("LINKEDIN_RETRY_BACKOFF_MAX", 20)
+
+# New jobs are queued and sent to process_jobs in batches of this size
+PROCESS_JOBS_BATCH_SIZE = env_literal("PROCESS_JOBS_BATCH_SIZE", 100)
+
+# Company logos are downloaded by a separate task, with this many threads
+COMPANY_LOGO_FETCH_CONCURRENCY = env_literal("COMPANY_LOGO_FETCH_CONCURRENCY", 8)
+COMPANY_LOGO_FETCH_TIMEOUT = env_literal("COMPANY_LOGO_FETCH_TIMEOUT", 10)
+
+# Prometheus metrics are served on this port by celery workers, None disables
+# it. /metrics requires this bearer token, or a staff user if it isn't set
+PROMETHEUS_WORKER_PORT = env_literal("PROMETHEUS_WORKER_PORT", 9808)
+METRICS_AUTH_TOKEN = os.environ.get("METRICS_AUTH_TOKEN")
+
 # Internationalization
 LANGUAGE_CODE = env_default("LANGUAGE_CODE", "en-us")
 TIME_ZONE = env_default("TIME_ZONE", "UTC")